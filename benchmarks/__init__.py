@@ -0,0 +1 @@
+"""Benchmark untuk weather info system"""
@@ -0,0 +1,281 @@
+# benchmarks/fetch_benchmark.py
+"""Benchmark refresh end-to-end terhadap stub server lokal: throughput, latensi p50/p95/p99 dan memori
+
+Jalankan dari root project:
+    python -m benchmarks.fetch_benchmark --counts 20 100 1000 10000 --strategies threaded async bulk \\
+        --latency lognormal:0.05,0.5 --error-rate 0.01 --throttle-rate 0.01 [--compare hasil_lama.json]
+
+Setiap skenario (strategi x jumlah kecamatan) berjalan di interpreter baru agar cache, koneksi,
+dan memori tidak saling mempengaruhi. Hasil ditulis sebagai JSON ke benchmarks/results/.
+Strategi sharded mengukur latensi request di proses worker, jadi kolom p50/p95/p99 dan RSS hanya
+mencerminkan proses induk.
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from services.stub_server import LatencyModel, StubWeatherServer  # noqa: E402
+from utils.helpers import is_module_available  # noqa: E402
+
+STRATEGIES = ('threaded', 'async', 'bulk', 'sharded')
+DEFAULT_COUNTS = (20, 100, 1000, 10000)
+RESULTS_DIR = PROJECT_ROOT / 'benchmarks' / 'results'
+
+# Kotak koordinat kasar Jawa Timur untuk kecamatan sintetis
+LAT_RANGE = (-8.7, -6.8)
+LON_RANGE = (111.0, 114.6)
+
+
+def write_districts_csv(count: int, path: str, seed: int = 0):
+    """Registry berisi kecamatan asli lalu kecamatan sintetis sampai jumlahnya `count`"""
+    source = PROJECT_ROOT / 'data' / 'districts.csv'
+    with open(source, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))[:count]
+    rng = random.Random(seed)
+    for i in range(len(rows) + 1, count + 1):
+        rows.append({
+            'id': i,
+            'kecamatan': f"Sintetis {i:05d}",
+            'kabupaten': f"Kabupaten Sintetis {i % 38:02d}",
+            'lat': round(rng.uniform(*LAT_RANGE), 4),
+            'lon': round(rng.uniform(*LON_RANGE), 4)
+        })
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['id', 'kecamatan', 'kabupaten', 'lat', 'lon'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Persentil nearest-rank dari list yang sudah terurut"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def max_rss_mb() -> Optional[float]:
+    """Puncak resident memory proses (None di platform tanpa modul resource)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_scenario(base_url: str, strategy: str, districts_file: str, workdir: str,
+                 rate_limit: float, use_tracemalloc: bool) -> Dict:
+    """Satu refresh penuh (fetch, bangun DataFrame, simpan snapshot/histori) di proses ini"""
+    from config.config import API_CONFIG, FILE_CONFIG, METRICS_CONFIG
+
+    API_CONFIG.update(base_url=base_url, fetch_engine=strategy, rate_limit_per_minute=rate_limit)
+    FILE_CONFIG.update(data_dir=workdir, districts_file=districts_file,
+                       history_dir=os.path.join(workdir, 'history'))
+    METRICS_CONFIG.update(textfile=os.path.join(workdir, 'metrics.prom'), port=0)
+
+    from models.weather_model import WeatherModel
+
+    model = WeatherModel('benchmark')
+    concurrency = model.api_service.transport.concurrency
+    latencies: List[float] = []
+    record = concurrency.record
+
+    def record_latency(latency: float, overloaded: bool = False):
+        latencies.append(latency)
+        record(latency, overloaded)
+
+    concurrency.record = record_latency
+
+    if use_tracemalloc:
+        import tracemalloc
+        tracemalloc.start()
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        model.fetch_all_weather_data()
+    elapsed = time.perf_counter() - start
+    rss_after = max_rss_mb()
+
+    rows = len(model.get_weather_dataframe())
+    latencies.sort()
+    result = {
+        'strategy': strategy,
+        'districts': len(model.api_service.registry),
+        'rows': rows,
+        'seconds': elapsed,
+        'throughput_per_second': rows / elapsed if elapsed > 0 else None,
+        'requests': len(latencies),
+        'latency_seconds': {
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1] if latencies else None
+        },
+        'max_rss_mb': rss_after,
+        'rss_growth_mb': (rss_after - rss_before) if rss_after is not None else None,
+        'final_concurrency_limit': concurrency.stats().get('limit')
+    }
+    if use_tracemalloc:
+        result['python_peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    model.api_service.transport.close()
+    return result
+
+
+def run_worker(args) -> int:
+    """Mode anak: menjalankan satu skenario dan mencetak hasilnya sebagai satu baris JSON"""
+    result = run_scenario(args.base_url, args.strategy, args.districts_file, args.workdir,
+                          args.rate_limit, args.tracemalloc)
+    print(json.dumps(result))
+    return 0
+
+
+def spawn_scenario(args, server: StubWeatherServer, strategy: str, districts_file: str) -> Dict:
+    before = server.stats()
+    with tempfile.TemporaryDirectory(prefix='bench_') as workdir:
+        command = [sys.executable, '-m', 'benchmarks.fetch_benchmark', '--worker',
+                   '--base-url', server.base_url, '--strategies', strategy,
+                   '--districts-file', districts_file, '--workdir', workdir,
+                   '--rate-limit', str(args.rate_limit)]
+        if args.tracemalloc:
+            command.append('--tracemalloc')
+        completed = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True,
+                                   timeout=args.timeout)
+    if completed.returncode != 0:
+        return {'strategy': strategy, 'error': completed.stderr.strip().splitlines()[-1:]}
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    after = server.stats()
+    result['server'] = {key: after[key] - before[key] for key in after}
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: List[Dict]):
+    print(f"{'strategi':<10}{'kecamatan':>10}{'detik':>9}{'baris/s':>10}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'RSS MB':>9}")
+    for result in results:
+        if 'error' in result or 'skipped' in result:
+            reason = result.get('skipped') or ' '.join(result['error'])
+            print(f"{result['strategy']:<10}{result.get('districts', ''):>10}  - {reason}")
+            continue
+        latency = result['latency_seconds']
+        ms = lambda value: f"{value * 1000:9.1f}" if value is not None else f"{'-':>9}"
+        rss = f"{result['max_rss_mb']:9.1f}" if result['max_rss_mb'] is not None else f"{'-':>9}"
+        print(f"{result['strategy']:<10}{result['districts']:>10}{result['seconds']:9.2f}"
+              f"{result['throughput_per_second']:10.1f}{ms(latency['p50'])}{ms(latency['p95'])}"
+              f"{ms(latency['p99'])}{rss}")
+
+
+def print_comparison(results: List[Dict], baseline_path: str):
+    """Rasio throughput dan p95 terhadap file hasil lain (>1 berarti throughput lebih baik)"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r['strategy'], r.get('districts')): r for r in json.load(f)['results']}
+    print(f"\nPerbandingan dengan {baseline_path}:")
+    for result in results:
+        old = baseline.get((result['strategy'], result.get('districts')))
+        if not old or 'seconds' not in old or 'seconds' not in result:
+            continue
+        throughput = result['throughput_per_second'] / old['throughput_per_second']
+        old_p95, new_p95 = old['latency_seconds']['p95'], result['latency_seconds']['p95']
+        p95 = f"{new_p95 / old_p95:.2f}x" if old_p95 and new_p95 else '-'
+        print(f"  {result['strategy']:<10}{result['districts']:>7} kecamatan: throughput {throughput:.2f}x, p95 {p95}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark refresh data cuaca terhadap stub server lokal')
+    parser.add_argument('--counts', type=int, nargs='+', default=list(DEFAULT_COUNTS))
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=STRATEGIES)
+    parser.add_argument('--latency', default='lognormal:0.05,0.5', help="distribusi latensi stub (lihat stub_server)")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rate-limit', type=float, default=0,
+                        help='API_CONFIG rate_limit_per_minute selama benchmark (0 = tanpa batas)')
+    parser.add_argument('--tracemalloc', action='store_true', help='ukur juga puncak alokasi Python (lebih lambat)')
+    parser.add_argument('--timeout', type=float, default=900, help='batas waktu per skenario (detik)')
+    parser.add_argument('--output', help='file JSON hasil (default benchmarks/results/fetch_<waktu>.json)')
+    parser.add_argument('--compare', help='file JSON hasil sebelumnya untuk dibandingkan')
+    # Argumen internal untuk proses anak
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--districts-file', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        args.strategy = args.strategies[0]
+        return run_worker(args)
+
+    server = StubWeatherServer(latency=LatencyModel.parse(args.latency), error_rate=args.error_rate,
+                               throttle_rate=args.throttle_rate, seed=args.seed)
+    server.start_background()
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix='bench_districts_') as tmp:
+            for count in args.counts:
+                districts_file = os.path.join(tmp, f"districts_{count}.csv")
+                write_districts_csv(count, districts_file, args.seed)
+                for strategy in args.strategies:
+                    if strategy == 'async' and not is_module_available('aiohttp'):
+                        results.append({'strategy': strategy, 'districts': count, 'skipped': 'aiohttp tidak tersedia'})
+                        continue
+                    print(f"⏳ {strategy} - {count} kecamatan...", flush=True)
+                    result = spawn_scenario(args, server, strategy, districts_file)
+                    result.setdefault('districts', count)
+                    results.append(result)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print()
+    print_results(results)
+
+    report = {
+        'benchmark': 'fetch',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'server': {'latency': repr(server.latency), 'error_rate': args.error_rate,
+                   'throttle_rate': args.throttle_rate, 'seed': args.seed},
+        'rate_limit_per_minute': args.rate_limit,
+        'results': results
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"fetch_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"\n💾 Hasil disimpan: {output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+# benchmarks/import_time.py
+"""Benchmark waktu startup: mengukur import di interpreter baru dan menjaga modul berat tetap lazy
+
+Jalankan dari root project:  python -m benchmarks.import_time [--runs N] [--budget DETIK]
+Exit code 1 bila budget terlampaui atau modul berat ikut dimuat terlalu awal.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Modul yang tidak boleh dimuat sebelum dibutuhkan
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'requests', 'aiohttp', 'pyarrow']
+
+# (nama skenario, kode yang diukur, modul berat yang boleh dimuat)
+SCENARIOS = [
+    ('startup', 'import main', []),
+    ('controller', "from controllers.weather_controller import WeatherController; WeatherController('benchmark')",
+     ['pandas', 'numpy', 'requests', 'pyarrow'])  # pandas 3 memuat pyarrow untuk dtype string
+]
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def measure(code: str) -> dict:
+    """Menjalankan kode di interpreter baru dan mengembalikan durasi serta modul berat yang termuat"""
+    probe = PROBE.format(code=code, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', probe], cwd=PROJECT_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(runs: int) -> dict:
+    results = {}
+    for name, code, allowed in SCENARIOS:
+        samples = [measure(code) for _ in range(runs)]
+        loaded = samples[-1]['loaded']
+        results[name] = {
+            'median_seconds': statistics.median(sample['seconds'] for sample in samples),
+            'min_seconds': min(sample['seconds'] for sample in samples),
+            'loaded_heavy_modules': loaded,
+            'unexpected_modules': [module for module in loaded if module not in allowed]
+        }
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark waktu import/startup aplikasi')
+    parser.add_argument('--runs', type=int, default=5, help='jumlah interpreter baru per skenario')
+    parser.add_argument('--budget', type=float, default=0.1,
+                        help='batas median waktu skenario startup (detik)')
+    parser.add_argument('--json', action='store_true', help='cetak hasil sebagai JSON')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.runs)
+    failures = [f"{name}: modul berat dimuat terlalu awal {result['unexpected_modules']}"
+                for name, result in results.items() if result['unexpected_modules']]
+    if results['startup']['median_seconds'] > args.budget:
+        failures.append(f"startup: {results['startup']['median_seconds']:.3f}s melebihi budget {args.budget:.3f}s")
+
+    if args.json:
+        print(json.dumps({'results': results, 'failures': failures}, indent=2))
+    else:
+        for name, result in results.items():
+            print(f"{name:<12} median {result['median_seconds'] * 1000:8.1f} ms  "
+                  f"min {result['min_seconds'] * 1000:8.1f} ms  modul berat: {', '.join(result['loaded_heavy_modules']) or '-'}")
+        for failure in failures:
+            print(f"❌ {failure}")
+        if not failures:
+            print("✅ Startup dalam budget")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# benchmarks/parse_benchmark.py
+"""Microbenchmark decode + parse response WeatherAPI menjadi record, jalur lama vs jalur baru
+
+Jalankan dari root project:  python -m benchmarks.parse_benchmark [--records N] [--repeat R]
+Jalur 'legacy' meniru kode sebelumnya: json.loads penuh lalu menyalin 12 field ke dict baru.
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from models.frame_builder import WeatherFrameBuilder
+from models.weather_data import WeatherData
+from services.json_codec import ORJSON_AVAILABLE
+from services.stub_server import fake_weather
+
+
+def legacy_parse(district: str, body: bytes) -> Dict:
+    """Jalur lama: response.json() lalu salin field ke dict"""
+    data = json.loads(body)
+    current = data['current']
+    location_info = data['location']
+    return {
+        'location': location_info['name'],
+        'district': district,
+        'temperature': current['temp_c'],
+        'feels_like': current['feelslike_c'],
+        'humidity': current['humidity'],
+        'wind_speed': current['wind_kph'],
+        'wind_direction': current['wind_dir'],
+        'condition': current['condition']['text'],
+        'visibility': current['vis_km'],
+        'pressure': current['pressure_mb'],
+        'uv_index': current['uv'],
+        'last_updated': current['last_updated'],
+        'last_updated_epoch': current.get('last_updated_epoch')
+    }
+
+
+def slotted_parse(district: str, body: bytes) -> WeatherData:
+    return WeatherData.from_api(district, json.loads(body))
+
+
+def build_paths() -> Dict[str, Callable[[str, bytes], object]]:
+    paths = {'legacy': legacy_parse, 'json+slots': slotted_parse}
+    if ORJSON_AVAILABLE:
+        import orjson
+
+        def orjson_parse(district: str, body: bytes) -> WeatherData:
+            return WeatherData.from_api(district, orjson.loads(body))
+        paths['orjson+slots'] = orjson_parse
+    return paths
+
+
+def make_payloads(count: int) -> List[tuple]:
+    """Body JSON realistis (ukuran mirip response current.json) untuk count kecamatan"""
+    payloads = []
+    for i in range(count):
+        data = fake_weather(f"Kecamatan {i}, East Java, Indonesia")
+        # Field tambahan yang dikirim API asli tetapi tidak dipakai aplikasi
+        data['location'].update({'lat': -7.25, 'lon': 112.75, 'tz_id': 'Asia/Jakarta',
+                                 'localtime_epoch': 1700000000, 'localtime': '2023-11-14 22:13'})
+        data['current'].update({'temp_f': 80.6, 'is_day': 1, 'wind_mph': 6.9, 'wind_degree': 120,
+                                'pressure_in': 29.8, 'precip_mm': 0.1, 'precip_in': 0.0, 'cloud': 75,
+                                'feelslike_f': 84.2, 'vis_miles': 6.0, 'gust_mph': 9.4, 'gust_kph': 15.1})
+        data['current']['condition'].update({'icon': '//cdn.weatherapi.com/weather/64x64/day/116.png',
+                                             'code': 1003})
+        payloads.append((f"Kecamatan {i}", json.dumps(data).encode('utf-8')))
+    return payloads
+
+
+def measure(parse: Callable, payloads: List[tuple], repeat: int) -> Dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for district, body in payloads:
+            parse(district, body)
+        samples.append((time.perf_counter() - start) / len(payloads))
+
+    # Memori yang tertahan oleh semua record (yang disimpan cache dan dibaca frame builder)
+    gc.collect()
+    tracemalloc.start()
+    records = [parse(district, body) for district, body in payloads]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    builder = WeatherFrameBuilder(len(records))
+    builder.extend(records)
+    builder.build()
+    build_seconds = time.perf_counter() - start
+
+    return {
+        'us_per_record': statistics.median(samples) * 1e6,
+        'retained_bytes_per_record': retained / len(payloads),
+        'frame_build_ms': build_seconds * 1000
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Microbenchmark decode/parse response WeatherAPI')
+    parser.add_argument('--records', type=int, default=5000, help='jumlah response per putaran')
+    parser.add_argument('--repeat', type=int, default=7, help='jumlah putaran (median dilaporkan)')
+    parser.add_argument('--json', action='store_true', help='cetak hasil sebagai JSON')
+    args = parser.parse_args(argv)
+
+    payloads = make_payloads(args.records)
+    results = {name: measure(parse, payloads, args.repeat) for name, parse in build_paths().items()}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    baseline = results['legacy']['us_per_record']
+    print(f"{len(payloads)} response, rata-rata {sum(len(body) for _, body in payloads) / len(payloads):.0f} byte")
+    print(f"{'jalur':<14}{'us/record':>10}{'speedup':>9}{'byte/record':>13}{'build ms':>10}")
+    for name, result in results.items():
+        print(f"{name:<14}{result['us_per_record']:10.2f}{baseline / result['us_per_record']:8.2f}x"
+              f"{result['retained_bytes_per_record']:13.0f}{result['frame_build_ms']:10.1f}")
+    if not ORJSON_AVAILABLE:
+        print("ℹ️  orjson tidak terpasang; jalur orjson dilewati (pip install orjson)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,5 @@
 """Configuration package untuk weather info system"""
 
-from .config import API_CONFIG, FILE_CONFIG, DISPLAY_CONFIG, PLOT_CONFIG
+from .config import API_CONFIG, FILE_CONFIG, DISPLAY_CONFIG, PLOT_CONFIG, METRICS_CONFIG, SERVER_CONFIG
 
-__all__ = ['API_CONFIG', 'FILE_CONFIG', 'DISPLAY_CONFIG', 'PLOT_CONFIG']
\ No newline at end of file
+__all__ = ['API_CONFIG', 'FILE_CONFIG', 'DISPLAY_CONFIG', 'PLOT_CONFIG', 'METRICS_CONFIG', 'SERVER_CONFIG']
\ No newline at end of file
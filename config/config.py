@@ -5,14 +5,44 @@
 API_CONFIG = {
     'base_url': "http://api.weatherapi.com/v1/current.json",
     'timeout': 10,
-    'max_workers': 5
+    'max_workers': 5,  # jumlah worker awal; disesuaikan otomatis oleh AdaptiveConcurrency
+    'concurrency_min': 1,
+    'concurrency_max': 32,
+    'latency_target': 1.0,  # detik; request lebih cepat dari ini menaikkan konkurensi
+    'rate_limit_per_minute': 600,  # batas panggilan per menit sesuai plan, 0 = tanpa batas
+    'rate_limit_burst': 20,
+    'max_retries': 3,
+    'backoff_factor': 0.5,
+    'backoff_max': 8.0,
+    'retry_statuses': (429, 500, 502, 503, 504),
+    'fetch_engine': 'threaded',  # 'threaded', 'async', 'bulk' atau 'sharded' (multi-proses)
+    'shard_processes': 0,  # jumlah proses engine sharded, 0 = jumlah core
+    'shard_min_districts': 500,  # minimal kecamatan per shard; registry kecil tidak dipecah
+    'shard_engine': 'threaded',  # fetcher di dalam tiap proses shard: 'threaded' atau 'async'
+    'bulk_batch_size': 50,  # jumlah lokasi per request bulk (q=bulk)
+    'stream_publish_interval': 0.5,  # detik antar publikasi snapshot parsial saat refresh
+    'refresh_interval': 900,  # detik antar refresh background, 0 = nonaktif
+    'refresh_batch_size': 0,  # jumlah kecamatan terlama per putaran, 0 = semua
+    'async_concurrency': 50,
+    'cache_ttl': 900,  # detik; 0 untuk menonaktifkan cache response
+    'cache_min_ttl': 60,
+    'cache_max_entries': 5000,
+    'query_by_coordinates': True  # query API memakai lat,lon dari registry bila tersedia
 }
 
 # File Configuration
 FILE_CONFIG = {
     'csv_prefix': 'cuaca_jatim',
     'plot_prefix': 'grafik_cuaca_jatim',
-    'encoding': 'utf-8'
+    'encoding': 'utf-8',
+    'data_dir': 'data',
+    'districts_file': 'data/districts.csv',
+    'snapshot_file': 'snapshot.parquet',  # .pkl dipakai otomatis bila pyarrow tidak terpasang
+    'snapshot_stale_after': 1800,  # detik sejak last_updated sebelum data dianggap basi
+    'history_dir': 'data/history',
+    'history_enabled': True,
+    'export_chunk_rows': 100_000,  # baris per chunk saat export streaming
+    'export_compression': 'zstd'  # kompresi Parquet/Feather ('zstd', 'lz4', 'snappy' untuk Parquet, None)
 }
 
 # Display Configuration
@@ -28,5 +58,26 @@ PLOT_CONFIG = {
     'palette': 'husl',
     'figure_size': (18, 12),
     'dpi': 300,
-    'backend': 'Agg'
-}
\ No newline at end of file
+    'preview_dpi': 72,
+    'backend': 'Agg',
+    'cache_dir': 'plot_cache',  # relatif terhadap FILE_CONFIG['data_dir']
+    'cache_max_bytes': 200 * 1024 * 1024,
+    'cache_max_entries': 50,
+    'render_executor': 'process',  # 'process' (paralel lintas core) atau 'thread'
+    'render_workers': 0  # 0 = jumlah core CPU
+}
+# Metrics Configuration
+METRICS_CONFIG = {
+    'textfile': 'data/metrics.prom',  # eksposisi Prometheus ditulis ulang setiap refresh; None = nonaktif
+    'port': 0,  # > 0 untuk endpoint http://host:port/metrics
+    'host': '127.0.0.1'
+}
+
+# Server Configuration (mode headless: python main.py --serve)
+SERVER_CONFIG = {
+    'host': '127.0.0.1',
+    'port': 8080,
+    'request_queue_size': 1024,  # antrian listen; ratusan klien bisa connect bersamaan
+    'gzip_min_bytes': 1024,  # respon lebih kecil dikirim tanpa gzip
+    'response_cache_entries': 1024  # respon per versi snapshot yang di-memo
+}
@@ -1,5 +1,10 @@
 """Controllers package untuk weather info system"""
 
-from .weather_controller import WeatherController
+from utils.helpers import lazy_exports
 
-__all__ = ['WeatherController']
\ No newline at end of file
+__getattr__ = lazy_exports(__name__, {
+    'WeatherController': '.weather_controller',
+    'WeatherHTTPController': '.http_controller'
+})
+
+__all__ = ['WeatherController', 'WeatherHTTPController']
\ No newline at end of file
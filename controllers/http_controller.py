@@ -0,0 +1,264 @@
+# controllers/http_controller.py
+"""Mode server headless: API HTTP/JSON read-only di atas snapshot cuaca di memori"""
+
+import gzip
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from models.weather_model import WeatherModel
+from models.weather_snapshot import WeatherSnapshot
+from models.refresh_scheduler import RefreshScheduler
+from services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+from services.single_flight import SingleFlight
+from config.config import SERVER_CONFIG
+
+JSON_CONTENT_TYPE = 'application/json; charset=utf-8'
+
+
+class ApiError(Exception):
+    """Error yang dikirim ke klien sebagai JSON {'error': ...} dengan status tertentu"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class CachedResponse:
+    """Body yang sudah di-serialize beserta ETag dan versi gzip-nya (dihitung sekali)"""
+
+    __slots__ = ('body', 'etag', 'content_type', '_gzipped')
+
+    def __init__(self, body: bytes, content_type: str = JSON_CONTENT_TYPE):
+        self.body = body
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.content_type = content_type
+        self._gzipped: Optional[bytes] = None
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+class WeatherHTTPController:
+    """Menyajikan snapshot aktif lewat HTTP; setiap respon di-memo per versi snapshot
+
+    Permintaan klien tidak pernah memicu fetch ke upstream; data diperbarui oleh RefreshScheduler.
+    """
+
+    def __init__(self, api_key: str, host: str = None, port: int = None):
+        self.model = WeatherModel(api_key)
+        self.scheduler = RefreshScheduler(self.model)
+        self.host = host or SERVER_CONFIG['host']
+        self.port = port if port is not None else SERVER_CONFIG['port']
+        self._responses: Dict[Tuple, CachedResponse] = {}
+        self._responses_version: Optional[int] = None
+        self._lock = threading.Lock()
+        # Klien bersamaan yang meminta respon sama untuk versi yang sama berbagi satu serialisasi
+        self._flight = SingleFlight('http')
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def run(self):
+        """Memuat data awal, menjalankan refresh berkala, lalu melayani HTTP sampai dihentikan"""
+        if not self.model.load_snapshot():
+            print("⏳ Memuat data cuaca...")
+            self.model.fetch_all_weather_data()
+
+        self.server = self.create_server()
+        self.scheduler.start()
+        print(f"🌐 API cuaca berjalan di http://{self.host}:{self.server.server_address[1]}/api/districts")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n👋 Server dihentikan")
+        finally:
+            self.scheduler.stop()
+            self.server.server_close()
+
+    def create_server(self) -> ThreadingHTTPServer:
+        """Server thread-per-koneksi dengan antrian listen yang cukup untuk ratusan klien"""
+        return WeatherHTTPServer((self.host, self.port), self, SERVER_CONFIG['request_queue_size'])
+
+    def get_response(self, path: str, query: Dict[str, str]) -> CachedResponse:
+        """Respon untuk satu route, dibuat sekali per versi snapshot lalu dipakai semua klien"""
+        if path == '/metrics':
+            return CachedResponse(REGISTRY.render().encode('utf-8'), METRICS_CONTENT_TYPE)
+
+        snapshot = self.model.get_snapshot()
+        key = (path, tuple(sorted(query.items())))
+        with self._lock:
+            if self._responses_version != snapshot.version:
+                self._responses = {}
+                self._responses_version = snapshot.version
+            cached = self._responses.get(key)
+        if cached is not None:
+            return cached
+        return self._flight.do((snapshot.version, key), lambda: self._build_response(path, query, snapshot, key))
+
+    def _build_response(self, path: str, query: Dict[str, str], snapshot: WeatherSnapshot,
+                        key: Tuple) -> CachedResponse:
+        """Serialisasi satu respon lalu menyimpannya bila versi snapshot masih yang aktif"""
+        payload = self.route(path, query, snapshot)
+        response = CachedResponse(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        with self._lock:
+            if (self._responses_version == snapshot.version
+                    and len(self._responses) < SERVER_CONFIG['response_cache_entries']):
+                self._responses[key] = response
+        return response
+
+    def route(self, path: str, query: Dict[str, str], snapshot: WeatherSnapshot) -> Dict:
+        """Membangun payload JSON untuk path dari snapshot yang diberikan"""
+        if path == '/health':
+            return {'status': 'ok', **self._meta(snapshot)}
+        if snapshot.is_empty:
+            raise ApiError(503, 'Data cuaca belum tersedia')
+
+        if path == '/api/districts':
+            return {**self._meta(snapshot), 'data': self._records(snapshot.frame)}
+        if path.startswith('/api/districts/'):
+            district = unquote(path[len('/api/districts/'):])
+            if snapshot.get(district) is None:
+                raise ApiError(404, f"Kecamatan '{district}' tidak ditemukan")
+            return {**self._meta(snapshot), 'data': self._records(snapshot.frame.loc[[district]])[0]}
+        if path == '/api/search':
+            condition = query.get('condition', '').strip()
+            expression = query.get('q', '').strip()
+            if not condition and not expression:
+                raise ApiError(400, "Parameter 'condition' atau 'q' wajib diisi")
+            try:
+                if expression:
+                    matches = self.model.query_engine.search(snapshot, expression)
+                    return {**self._meta(snapshot), 'q': expression, 'data': self._records(matches)}
+                matches = self.model.query_engine.search_condition(snapshot, condition)
+            except ValueError as e:
+                raise ApiError(400, str(e))
+            return {**self._meta(snapshot), 'condition': condition, 'data': self._records(matches)}
+        if path == '/api/stats':
+            return {
+                **self._meta(snapshot),
+                # Dihitung dari snapshot yang sama dengan versi tempat respon ini disimpan
+                'summary': self._to_builtin(self.model.stats_engine.summary(snapshot)),
+                'conditions': self._to_builtin(self.model.stats_engine.condition_counts(snapshot).to_dict())
+            }
+        raise ApiError(404, f"Route tidak ditemukan: {path}")
+
+    @staticmethod
+    def _meta(snapshot: WeatherSnapshot) -> Dict:
+        return {
+            'fetched_at': snapshot.fetched_at.isoformat() if snapshot.fetched_at else None,
+            'count': len(snapshot)
+        }
+
+    @staticmethod
+    def _records(frame: pd.DataFrame) -> list:
+        """Baris DataFrame sebagai list dict; float32 dibulatkan agar tidak tampil 26.3999996, NaN/NA -> None"""
+        out = frame.reset_index()
+        columns = {}
+        for col in out.columns:
+            series = out[col]
+            if series.dtype == np.float32:
+                series = series.astype('float64').round(2)
+            elif col == 'last_updated':
+                series = series.dt.strftime('%Y-%m-%d %H:%M')
+            columns[col] = series.astype(object).where(series.notna(), None).tolist()
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+    @classmethod
+    def _to_builtin(cls, value):
+        """Mengubah nilai numpy/NaN menjadi tipe yang bisa di-serialize JSON"""
+        if isinstance(value, dict):
+            return {str(k): cls._to_builtin(v) for k, v in value.items()}
+        if isinstance(value, (np.integer,)):
+            return int(value)
+        if isinstance(value, (float, np.floating)):
+            return None if np.isnan(value) else round(float(value), 2)
+        return value
+
+
+class WeatherHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], controller: WeatherHTTPController, request_queue_size: int):
+        # request_queue_size dipakai saat listen() di dalam __init__ induk
+        self.request_queue_size = request_queue_size
+        self.controller = controller
+        super().__init__(address, WeatherRequestHandler)
+
+
+class WeatherRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD dengan dukungan If-None-Match (304) dan Content-Encoding gzip"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body: bool):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip('/') or '/'
+        try:
+            response = self.server.controller.get_response(path, query)
+        except ApiError as e:
+            self._send_error_json(e.status, str(e), send_body)
+            return
+
+        if self._etag_matches(response.etag):
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = response.body
+        use_gzip = (len(body) >= SERVER_CONFIG['gzip_min_bytes']
+                    and 'gzip' in self.headers.get('Accept-Encoding', ''))
+        if use_gzip:
+            body = response.gzipped()
+        self.send_response(200)
+        self.send_header('Content-Type', response.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', response.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Vary', 'Accept-Encoding')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _etag_matches(self, etag: str) -> bool:
+        header = self.headers.get('If-None-Match')
+        if not header:
+            return False
+        candidates = [tag.strip() for tag in header.split(',')]
+        return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
+
+    def _send_error_json(self, status: int, message: str, send_body: bool = True):
+        body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', JSON_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _not_allowed(self):
+        self._send_error_json(405, 'Hanya GET dan HEAD yang didukung')
+
+    do_POST = do_PUT = do_DELETE = do_PATCH = _not_allowed
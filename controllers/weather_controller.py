@@ -1,13 +1,26 @@
 # controllers/weather_controller.py
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
 from models.weather_model import WeatherModel
+from models.refresh_scheduler import RefreshScheduler
+from models.query_engine import is_query
+from utils.name_index import district_index
 from views.weather_view import WeatherView
+from services.metrics import start_metrics_server
+from config.config import METRICS_CONFIG
 
 class WeatherController:
     """Controller untuk mengelola logika aplikasi"""
     
+    DESCRIBE_COLUMNS = ['temperature', 'humidity', 'wind_speed', 'pressure', 'uv_index']
+    
     def __init__(self, api_key: str):
         self.model = WeatherModel(api_key)
         self.view = WeatherView()
+        self.scheduler = RefreshScheduler(self.model)
+        self.render_jobs = []  # job render grafik yang masih berjalan di background
+        self.refresh_job: Optional[Future] = None  # refresh manual (menu 6) yang berjalan di background
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
         self.running = True
     
     def run(self):
@@ -15,13 +28,35 @@ class WeatherController:
         self.view.clear_screen()
         self.view.show_header()
         
-        # Load data awal
-        self.view.show_loading()
-        self.model.fetch_all_weather_data_threaded()
+        # Load data awal: pakai snapshot terakhir bila ada, fetch penuh bila tidak
+        if not self.model.load_snapshot():
+            self.view.show_loading()
+            self.model.fetch_all_weather_data()
+        
+        # Endpoint /metrics opsional untuk scraping Prometheus
+        if METRICS_CONFIG['port'] > 0:
+            start_metrics_server(METRICS_CONFIG['port'], METRICS_CONFIG['host'])
         
+        # Refresh berkala di background; menu tetap responsif
+        self.scheduler.start()
+        try:
+            self.run_menu_loop()
+        finally:
+            self.scheduler.stop()
+            if self._refresh_executor is not None:
+                self._refresh_executor.shutdown(wait=False, cancel_futures=True)
+            self.view.shutdown()
+    
+    def run_menu_loop(self):
+        """Loop menu interaktif"""
         while self.running:
             self.view.clear_screen()
             self.view.show_header()
+            if self.model.fetched_at:
+                stale_count = len(self.model.get_stale_districts())
+                self.view.show_data_status(self.model.fetched_at, stale_count)
+            self.report_refresh_job()
+            self.report_render_jobs()
             self.view.show_main_menu()
             
             try:
@@ -34,6 +69,30 @@ class WeatherController:
                 self.view.show_error(f"Terjadi kesalahan: {e}")
                 input("\nTekan Enter untuk melanjutkan...")
     
+    def report_refresh_job(self):
+        """Menampilkan progress refresh manual, atau hasilnya bila sudah selesai"""
+        job = self.refresh_job
+        if job is None:
+            return
+        if not job.done():
+            self.view.show_refresh_status(self.model.get_refresh_progress())
+            return
+        
+        self.refresh_job = None
+        try:
+            job.result()
+            self.view.show_success("Data cuaca berhasil diperbarui!")
+        except Exception as e:
+            self.view.show_error(f"Refresh gagal: {e}")
+        print()
+    
+    def report_render_jobs(self):
+        """Menampilkan job render yang sudah selesai dan membuangnya dari daftar"""
+        finished = [job for job in self.render_jobs if job.done()]
+        if finished:
+            self.render_jobs = [job for job in self.render_jobs if not job.done()]
+            self.view.show_render_jobs(finished)
+    
     def handle_menu_choice(self, choice: str):
         """Menangani pilihan menu"""
         if choice == '1':
@@ -61,7 +120,7 @@ class WeatherController:
         self.view.show_header()
         
         weather_df = self.model.get_weather_dataframe()
-        self.view.show_weather_summary(weather_df)
+        self.view.show_weather_summary(weather_df, self.model.get_refresh_progress())
         
         input("\nTekan Enter untuk kembali ke menu...")
     
@@ -70,13 +129,13 @@ class WeatherController:
         self.view.clear_screen()
         self.view.show_header()
         
-        weather_df = self.model.get_weather_dataframe()
-        if weather_df.empty:
+        snapshot = self.model.get_snapshot()
+        if snapshot.is_empty:
             self.view.show_error("Tidak ada data cuaca tersedia")
             input("\nTekan Enter untuk kembali ke menu...")
             return
         
-        districts = list(weather_df.index)
+        districts = snapshot.districts
         self.view.show_districts_list(districts)
         
         try:
@@ -89,16 +148,9 @@ class WeatherController:
                 else:
                     raise ValueError("Nomor tidak valid")
             else:
-                # Cari berdasarkan nama
-                district = None
-                for d in districts:
-                    if choice.lower() in d.lower():
-                        district = d
-                        break
-                if not district:
-                    raise ValueError("Kecamatan tidak ditemukan")
+                district = self.resolve_district_name(choice, districts)
             
-            weather_data = self.model.get_weather_data(district)
+            weather_data = snapshot.get(district)
             if weather_data is not None:
                 self.view.clear_screen()
                 self.view.show_header()
@@ -111,18 +163,39 @@ class WeatherController:
         
         input("\nTekan Enter untuk kembali ke menu...")
     
+    def resolve_district_name(self, term: str, districts) -> str:
+        """Mencari kecamatan lewat index nama; bila ambigu pengguna memilih dari kandidat berperingkat"""
+        matches = district_index(districts).resolve(term)
+        if not matches:
+            raise ValueError("Kecamatan tidak ditemukan")
+        if len(matches) == 1:
+            return matches[0].name
+        
+        self.view.show_district_candidates(term, matches)
+        choice = input("Pilih nomor kandidat (Enter = 1): ").strip() or '1'
+        if not choice.isdigit() or not 1 <= int(choice) <= len(matches):
+            raise ValueError("Nomor tidak valid")
+        return matches[int(choice) - 1].name
+    
     def search_weather_by_condition(self):
         """Mencari cuaca berdasarkan kondisi"""
         self.view.clear_screen()
         self.view.show_header()
         
-        condition = input("Masukkan kondisi cuaca yang dicari (misal: Cloudy, Sunny, Rain): ").strip()
+        print("Contoh: Rain, Cloudy, atau query 'temperature > 32 AND humidity > 80 AND condition ~ rain'")
+        condition = input("Masukkan kondisi cuaca atau query yang dicari: ").strip()
         
-        if condition:
-            weather_df = self.model.get_weather_dataframe()
-            self.view.show_weather_by_condition(weather_df, condition)
-        else:
+        if not condition:
             self.view.show_error("Kondisi cuaca tidak boleh kosong")
+        else:
+            try:
+                if is_query(condition):
+                    results = self.model.search_weather(condition)
+                else:
+                    results = self.model.search_by_condition(condition)
+                self.view.show_weather_by_condition(results, condition)
+            except ValueError as e:
+                self.view.show_error(str(e))
         
         input("\nTekan Enter untuk kembali ke menu...")
     
@@ -140,20 +213,39 @@ class WeatherController:
         print("📊 PILIHAN STATISTIK:")
         print("1. Tampilkan statistik saja")
         print("2. Tampilkan statistik + buat grafik")
+        print("3. Statistik per kabupaten")
+        print("4. Statistik per kondisi cuaca")
+        print("5. Tampilkan statistik + grafik preview (cepat, resolusi rendah)")
+        print("6. Buat grafik per kabupaten (paralel di background)")
         
-        choice = input("\nPilih opsi (1-2): ").strip()
+        choice = input("\nPilih opsi (1-6): ").strip()
         
-        if choice == '1':
-            self.view.show_weather_statistics(weather_df, save_plots=False)
-        elif choice == '2':
-            self.view.show_weather_statistics(weather_df, save_plots=True)
+        job = None
+        if choice in ('1', '2', '5'):
+            # Statistik dimemo per versi snapshot, jadi kunjungan berulang tidak menghitung ulang
+            stats_df = self.model.get_statistics_table()[self.DESCRIBE_COLUMNS]
+            stats = (stats_df, self.model.get_condition_counts())
+            job = self.view.show_weather_statistics(weather_df, save_plots=(choice != '1'), stats=stats,
+                                                    preview=(choice == '5'))
+        elif choice == '3':
+            self.view.show_grouped_statistics(self.model.get_grouped_statistics('kabupaten'), 'kabupaten')
+        elif choice == '4':
+            self.view.show_grouped_statistics(self.model.get_grouped_statistics('condition'), 'condition')
+        elif choice == '6':
+            job = self.view.submit_kabupaten_plots(weather_df, self.model.get_kabupaten_lookup())
         else:
             self.view.show_error("Pilihan tidak valid")
         
+        # Render berjalan di worker pool; hasilnya dilaporkan di menu utama saat selesai
+        if job is not None:
+            self.render_jobs.append(job)
+        
         input("\nTekan Enter untuk kembali ke menu...")
     
+    EXPORT_FORMAT_CHOICES = {'1': 'csv', '2': 'csv.gz', '3': 'csv.zst', '4': 'parquet', '5': 'feather'}
+    
     def export_data(self):
-        """Export data ke CSV"""
+        """Export data ke CSV, CSV terkompresi, Parquet atau Feather"""
         self.view.clear_screen()
         self.view.show_header()
         
@@ -163,13 +255,34 @@ class WeatherController:
             input("\nTekan Enter untuk kembali ke menu...")
             return
         
-        print("💾 EXPORT DATA KE CSV")
+        print("💾 EXPORT DATA")
         print("=" * 30)
+        print("1. CSV")
+        print("2. CSV gzip (.csv.gz)")
+        print("3. CSV zstd (.csv.zst)")
+        print("4. Parquet")
+        print("5. Feather / Arrow IPC")
+        
+        fmt = self.EXPORT_FORMAT_CHOICES.get(input("\nPilih format (1-5, kosong = CSV): ").strip() or '1')
+        if fmt is None:
+            self.view.show_error("Pilihan tidak valid")
+            input("\nTekan Enter untuk kembali ke menu...")
+            return
         
         custom_name = input("Masukkan nama file (kosong untuk otomatis): ").strip()
         filename = custom_name if custom_name else None
         
-        exported_file = self.model.export_to_csv(filename)
+        print(f"Kolom tersedia: {', '.join(weather_df.columns)}")
+        column_input = input("Kolom yang di-export (pisahkan dengan koma, kosong = semua): ").strip()
+        columns = [col.strip() for col in column_input.split(',') if col.strip()] or None
+        
+        append = input("Tambahkan ke export sebelumnya? (y/N): ").strip().lower() == 'y'
+        
+        try:
+            exported_file = self.model.export_data(fmt, filename, columns, mode='append' if append else 'overwrite')
+        except (ValueError, ImportError) as e:
+            self.view.show_error(str(e))
+            exported_file = None
         
         if exported_file:
             self.view.show_success(f"Data berhasil di-export ke: {exported_file}")
@@ -180,13 +293,18 @@ class WeatherController:
         input("\nTekan Enter untuk kembali ke menu...")
     
     def refresh_data(self):
-        """Refresh data cuaca"""
+        """Refresh data cuaca di background; selama berjalan menu 1 menampilkan data parsial"""
         self.view.clear_screen()
         self.view.show_header()
-        self.view.show_loading()
         
-        # Refresh data dengan threading
-        self.model.fetch_all_weather_data_threaded()
-        self.view.show_success("Data cuaca berhasil diperbarui!")
+        if self.refresh_job is not None and not self.refresh_job.done():
+            self.view.show_refresh_status(self.model.get_refresh_progress())
+        else:
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='manual-refresh')
+            # Refresh dengan engine yang dikonfigurasi; tanpa output per kecamatan agar tidak menimpa menu
+            self.refresh_job = self._refresh_executor.submit(self.model.fetch_all_weather_data, verbose=False)
+            self.view.show_success("Refresh dimulai di background, menu tetap bisa dipakai "
+                                   "(menu 1 menampilkan kecamatan yang sudah diperbarui)")
         
         input("\nTekan Enter untuk kembali ke menu...")
\ No newline at end of file
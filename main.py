@@ -4,6 +4,7 @@ Main application untuk Sistem Informasi Cuaca Jawa Timur
 Menggunakan pola MVC (Model-View-Controller) dengan OOP
 """
 
+import argparse
 import sys
 import os
 from pathlib import Path
@@ -12,11 +13,10 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from controllers.weather_controller import WeatherController
-from utils.helpers import validate_api_key, ColoredOutput
+from utils.helpers import validate_api_key, is_module_available, ColoredOutput
 
 def check_dependencies():
-    """Cek dependencies yang diperlukan"""
+    """Cek dependencies yang diperlukan (lewat import spec, tanpa benar-benar meng-import)"""
     required_packages = {
         'pandas': 'pandas',
         'matplotlib': 'matplotlib',
@@ -27,10 +27,9 @@ def check_dependencies():
     missing_packages = []
     
     for package_name, import_name in required_packages.items():
-        try:
-            __import__(import_name)
+        if is_module_available(import_name):
             ColoredOutput.print_success(f"{package_name} tersedia")
-        except ImportError:
+        else:
             missing_packages.append(package_name)
             ColoredOutput.print_error(f"{package_name} tidak ditemukan")
     
@@ -68,8 +67,33 @@ def show_welcome():
     ColoredOutput.print_colored("Mendukung threading untuk performa optimal", 'MAGENTA')
     print()
 
+def parse_args(argv=None):
+    """Argumen command line; tanpa argumen aplikasi berjalan interaktif seperti biasa"""
+    parser = argparse.ArgumentParser(description="Sistem Informasi Cuaca Jawa Timur")
+    parser.add_argument('--serve', action='store_true',
+                        help='jalankan API HTTP/JSON headless alih-alih menu interaktif')
+    parser.add_argument('--host', help='alamat bind server (default SERVER_CONFIG)')
+    parser.add_argument('--port', type=int, help='port server (default SERVER_CONFIG)')
+    parser.add_argument('--api-key', help='API key WeatherAPI.com (default env WEATHERAPI_KEY)')
+    return parser.parse_args(argv)
+
+def run_server(args):
+    """Mode headless: tanpa input(), API key dari argumen atau environment"""
+    api_key = args.api_key or os.environ.get('WEATHERAPI_KEY', '')
+    if not validate_api_key(api_key):
+        ColoredOutput.print_error("API key wajib diisi lewat --api-key atau env WEATHERAPI_KEY")
+        sys.exit(2)
+    
+    from controllers.http_controller import WeatherHTTPController
+    WeatherHTTPController(api_key, args.host, args.port).run()
+
 def main():
     """Fungsi utama aplikasi"""
+    args = parse_args()
+    if args.serve:
+        run_server(args)
+        return
+    
     try:
         # Show welcome message
         show_welcome()
@@ -88,6 +112,8 @@ def main():
         
         # Initialize and run controller
         ColoredOutput.print_info("Menginisialisasi aplikasi...")
+        # Import berat (pandas, requests) baru dimuat setelah API key didapat
+        from controllers.weather_controller import WeatherController
         controller = WeatherController(api_key)
         controller.run()
         
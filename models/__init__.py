@@ -1,7 +1,14 @@
 # models/__init__.py
 """Models package untuk weather info system"""
 
-from .weather_data import WeatherData
-from .weather_model import WeatherModel
+from utils.helpers import lazy_exports
+
+# Di-import saat pertama dipakai agar pandas tidak ikut dimuat saat startup
+_EXPORTS = {
+    'WeatherData': '.weather_data',
+    'WeatherModel': '.weather_model'
+}
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = ['WeatherData', 'WeatherModel']
\ No newline at end of file
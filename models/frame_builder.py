@@ -0,0 +1,214 @@
+# models/frame_builder.py
+"""Builder DataFrame cuaca berbasis array bertipe yang dialokasikan di awal"""
+
+import json
+import struct
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from models.weather_data import FIELDS, WeatherData
+from services.metrics import FRAME_BUILD_SECONDS
+
+# Kolom numerik dan dtype array-nya; nilai hilang/tidak valid disimpan sebagai NaN
+NUMERIC_COLUMNS = {
+    'temperature': np.float32,
+    'feels_like': np.float32,
+    'humidity': np.float32,
+    'wind_speed': np.float32,
+    'visibility': np.float32,
+    'pressure': np.float32,
+    'uv_index': np.float32,
+    'last_updated_epoch': np.float64  # detik Unix; float32 tidak cukup presisi
+}
+# Kolom bilangan bulat: dibangun sebagai integer nullable pandas (Int16 cukup untuk kelembaban 0-100)
+# sehingga nilai hilang tetap <NA>, bukan angka sentinel yang ikut dihitung statistik dan query
+NULLABLE_INTEGER_COLUMNS = {'humidity': 'Int16', 'last_updated_epoch': 'Int64'}
+CATEGORICAL_COLUMNS = ('location', 'wind_direction', 'condition')
+COLUMN_ORDER = ['location', 'temperature', 'feels_like', 'humidity', 'wind_speed',
+                'wind_direction', 'condition', 'visibility', 'pressure', 'uv_index', 'last_updated',
+                'last_updated_epoch']
+LAST_UPDATED_FORMAT = '%Y-%m-%d %H:%M'
+
+# Format hand-off antar proses: magic, panjang header (uint32 LE), header JSON, lalu buffer array mentah
+ENCODING_MAGIC = b'WFB1'
+_HEADER_LENGTH = struct.Struct('<I')
+
+
+def _to_number(value, dtype):
+    """Konversi aman ke angka; nilai tidak valid menjadi NaN"""
+    try:
+        return dtype(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_array(values: Sequence, dtype) -> np.ndarray:
+    """Konversi satu kolom sekaligus; bila ada nilai tidak valid, jatuh ke konversi per nilai"""
+    try:
+        return np.array(values, dtype=np.float64).astype(dtype, copy=False)
+    except (TypeError, ValueError):
+        return np.array([_to_number(value, dtype) for value in values], dtype=dtype)
+
+
+def _to_nullable_integer(array: np.ndarray, dtype: str) -> pd.api.extensions.ExtensionArray:
+    """Array float ber-NaN menjadi array integer nullable pandas (NaN -> <NA>)"""
+    missing = np.isnan(array)
+    values = np.where(missing, 0, np.round(array)).astype(pd.api.types.pandas_dtype(dtype).numpy_dtype)
+    return pd.arrays.IntegerArray(values, missing)
+
+
+class WeatherFrameBuilder:
+    """Mengisi array bertipe per record lalu membangun DataFrame sekali tanpa salinan"""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 1)
+        self.size = 0
+        self.districts: List[str] = []
+        self.last_updated: List[str] = []
+        self.numeric = {col: np.empty(self.capacity, dtype=dtype) for col, dtype in NUMERIC_COLUMNS.items()}
+        self.codes = {col: np.empty(self.capacity, dtype=np.int32) for col in CATEGORICAL_COLUMNS}
+        self.categories: Dict[str, Dict[str, int]] = {col: {} for col in CATEGORICAL_COLUMNS}
+
+    def _grow(self):
+        """Menggandakan kapasitas bila record melebihi perkiraan awal"""
+        self.capacity *= 2
+        for col, array in self.numeric.items():
+            self.numeric[col] = np.resize(array, self.capacity)
+        for col, array in self.codes.items():
+            self.codes[col] = np.resize(array, self.capacity)
+
+    def append(self, record):
+        """Menambahkan satu record hasil parse API (WeatherData atau dict dengan field yang sama)"""
+        if self.size == self.capacity:
+            self._grow()
+        i = self.size
+
+        for col, array in self.numeric.items():
+            array[i] = _to_number(record[col], array.dtype.type)
+        for col in CATEGORICAL_COLUMNS:
+            mapping = self.categories[col]
+            self.codes[col][i] = mapping.setdefault(record[col], len(mapping))
+
+        self.districts.append(record['district'])
+        self.last_updated.append(record['last_updated'])
+        self.size += 1
+
+    def extend(self, records: Sequence):
+        """Menambahkan banyak record sekaligus: kolom dikonversi per array, bukan per nilai"""
+        if not records:
+            return
+        rows = [record.to_tuple() if isinstance(record, WeatherData) else tuple(record[f] for f in FIELDS)
+                for record in records]
+        while self.size + len(rows) > self.capacity:
+            self._grow()
+        start, end = self.size, self.size + len(rows)
+
+        columns = dict(zip(FIELDS, zip(*rows)))
+        for col, array in self.numeric.items():
+            array[start:end] = _to_array(columns[col], array.dtype.type)
+        for col in CATEGORICAL_COLUMNS:
+            mapping = self.categories[col]
+            self.codes[col][start:end] = [mapping.setdefault(value, len(mapping)) for value in columns[col]]
+
+        self.districts.extend(columns['district'])
+        self.last_updated.extend(columns['last_updated'])
+        self.size = end
+
+    def to_bytes(self) -> bytes:
+        """Array bertipe yang sudah terisi sebagai satu blob biner (untuk dikirim dari proses worker)
+
+        String (nama kecamatan, kategori, last_updated unik) masuk header JSON; kolom numerik dan
+        kode kategori dikirim sebagai buffer mentah tanpa pickle per record.
+        """
+        n = self.size
+        last_updated_codes: Dict[str, int] = {}
+        arrays = {col: array[:n] for col, array in self.numeric.items()}
+        arrays.update({f"{col}_codes": self.codes[col][:n] for col in CATEGORICAL_COLUMNS})
+        arrays['last_updated_codes'] = np.fromiter(
+            (last_updated_codes.setdefault(value, len(last_updated_codes)) for value in self.last_updated),
+            dtype=np.int32, count=n)
+
+        layout, offset = [], 0
+        for name, array in arrays.items():
+            layout.append([name, array.dtype.str, offset, array.nbytes])
+            offset += array.nbytes
+        header = json.dumps({
+            'rows': n,
+            'arrays': layout,
+            'categories': {col: list(self.categories[col]) for col in CATEGORICAL_COLUMNS},
+            'last_updated': list(last_updated_codes),
+            'districts': self.districts
+        }, ensure_ascii=False).encode('utf-8')
+        return b''.join([ENCODING_MAGIC, _HEADER_LENGTH.pack(len(header)), header]
+                        + [array.tobytes() for array in arrays.values()])
+
+    @staticmethod
+    def decode(blob: bytes):
+        """(header, dict nama -> array) dari blob to_bytes; array adalah view tanpa salinan"""
+        if blob[:4] != ENCODING_MAGIC:
+            raise ValueError("Blob bukan hasil WeatherFrameBuilder.to_bytes")
+        (header_length,) = _HEADER_LENGTH.unpack_from(blob, 4)
+        body_start = 4 + _HEADER_LENGTH.size + header_length
+        header = json.loads(blob[4 + _HEADER_LENGTH.size:body_start])
+        arrays = {
+            name: np.frombuffer(blob, dtype=np.dtype(dtype), count=nbytes // np.dtype(dtype).itemsize,
+                                offset=body_start + offset)
+            for name, dtype, offset, nbytes in header['arrays']
+        }
+        return header, arrays
+
+    def extend_encoded(self, blob: bytes):
+        """Menggabungkan blob to_bytes dari builder lain; kode kategori dipetakan ulang secara vektor"""
+        header, arrays = self.decode(blob)
+        n = header['rows']
+        if n == 0:
+            return
+        while self.size + n > self.capacity:
+            self._grow()
+        start, end = self.size, self.size + n
+
+        for col, array in self.numeric.items():
+            array[start:end] = arrays[col]
+        for col in CATEGORICAL_COLUMNS:
+            mapping = self.categories[col]
+            remap = np.array([mapping.setdefault(value, len(mapping)) for value in header['categories'][col]],
+                             dtype=np.int32)
+            self.codes[col][start:end] = remap[arrays[f"{col}_codes"]]
+
+        last_updated = header['last_updated']
+        self.last_updated.extend([last_updated[code] for code in arrays['last_updated_codes'].tolist()])
+        self.districts.extend(header['districts'])
+        self.size = end
+
+    def records(self, start: int = 0, end: int = None) -> List[WeatherData]:
+        """Baris start..end sebagai WeatherData (misal untuk mengisi cache dari hasil extend_encoded)"""
+        end = self.size if end is None else end
+        columns = {col: array[start:end].tolist() for col, array in self.numeric.items()}
+        for col in CATEGORICAL_COLUMNS:
+            categories = list(self.categories[col])
+            columns[col] = [categories[code] for code in self.codes[col][start:end].tolist()]
+        columns['district'] = self.districts[start:end]
+        columns['last_updated'] = self.last_updated[start:end]
+        return [WeatherData(*values) for values in zip(*(columns[field] for field in FIELDS))]
+
+    def build(self) -> pd.DataFrame:
+        """Membangun DataFrame ber-index district dari array yang sudah terisi"""
+        with FRAME_BUILD_SECONDS.time():
+            return self._build()
+
+    def _build(self) -> pd.DataFrame:
+        if self.size == 0:
+            return pd.DataFrame()
+
+        n = self.size
+        columns = {col: array[:n] for col, array in self.numeric.items()}
+        for col, dtype in NULLABLE_INTEGER_COLUMNS.items():
+            columns[col] = _to_nullable_integer(columns[col], dtype)
+        for col in CATEGORICAL_COLUMNS:
+            columns[col] = pd.Categorical.from_codes(self.codes[col][:n], categories=list(self.categories[col]))
+        columns['last_updated'] = pd.to_datetime(self.last_updated, format=LAST_UPDATED_FORMAT, errors='coerce')
+
+        index = pd.Index(self.districts, name='district')
+        return pd.DataFrame({col: columns[col] for col in COLUMN_ORDER}, index=index, copy=False)
@@ -0,0 +1,233 @@
+# models/query_engine.py
+"""Query engine multi-kriteria dengan index yang dibangun sekali per versi snapshot
+
+Contoh query: ``temperature > 32 AND humidity >= 80 AND condition ~ rain``
+Operator numerik: >, >=, <, <=, =. Kolom kategori (condition, wind_direction): ``~`` (kata diawali
+teks, tidak peka huruf besar) dan ``=`` (sama persis, tidak peka huruf besar).
+"""
+
+import bisect
+import functools
+import re
+import threading
+from collections import namedtuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models.frame_builder import NUMERIC_COLUMNS
+from models.weather_snapshot import WeatherSnapshot
+
+Predicate = namedtuple('Predicate', ['column', 'op', 'value'])
+
+NUMERIC_OPERATORS = ('>', '>=', '<', '<=', '=')
+CATEGORICAL_OPERATORS = ('~', '=')
+_CLAUSE = re.compile(r'^\s*(\w+)\s*(>=|<=|==|=|>|<|~)\s*(.+?)\s*$')
+_AND = re.compile(r'\s+AND\s+|\s*&&\s*', re.IGNORECASE)
+_TOKEN = re.compile(r'[a-z0-9]+')
+_OPERATOR = re.compile(r'[<>=~]')
+_EMPTY = np.empty(0, dtype=np.intp)
+COMPARATORS = {'>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal, '=': np.equal}
+QUERY_CATEGORICAL_COLUMNS = ('wind_direction', 'condition')
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Token huruf kecil alfanumerik, misal 'Patchy rain possible' -> ['patchy', 'rain', 'possible']"""
+    return _TOKEN.findall(str(text).lower())
+
+
+def is_query(text: str) -> bool:
+    """True bila teks berisi operator query (bukan sekadar kata kondisi cuaca)"""
+    return bool(_OPERATOR.search(text))
+
+
+class CategoryIndex:
+    """Inverted index satu kolom kategori: token -> nilai kategori -> posisi baris"""
+
+    __slots__ = ('codes', 'categories', 'postings', 'by_lower', 'tokens', 'token_codes')
+
+    def __init__(self, values: pd.Series):
+        categorical = values.astype('category') if not isinstance(values.dtype, pd.CategoricalDtype) else values
+        self.codes = categorical.cat.codes.to_numpy()
+        self.categories = [str(category) for category in categorical.cat.categories]
+        order = np.argsort(self.codes, kind='stable')
+        boundaries = np.searchsorted(self.codes[order], np.arange(len(self.categories) + 1))
+
+        self.postings: List[np.ndarray] = []
+        self.token_codes: Dict[str, set] = {}
+        for code, category in enumerate(self.categories):
+            self.postings.append(order[boundaries[code]:boundaries[code + 1]])
+            for token in normalize_tokens(category):
+                self.token_codes.setdefault(token, set()).add(code)
+        self.by_lower = {category.lower(): code for code, category in enumerate(self.categories)}
+        self.tokens = sorted(self.token_codes)
+
+    def _codes_with_prefix(self, prefix: str) -> set:
+        matched = set()
+        start = bisect.bisect_left(self.tokens, prefix)
+        for token in self.tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            matched |= self.token_codes[token]
+        return matched
+
+    def matching_codes(self, op: str, text: str) -> set:
+        """Kode kategori yang cocok: '~' setiap kata query menjadi awalan kata kategori, '=' sama persis"""
+        if op == '=':
+            code = self.by_lower.get(str(text).strip().lower())
+            return {code} if code is not None else set()
+        query_tokens = normalize_tokens(text)
+        if not query_tokens:
+            raise ValueError("Teks pencarian kosong")
+        codes = self._codes_with_prefix(query_tokens[0])
+        for token in query_tokens[1:]:
+            codes &= self._codes_with_prefix(token)
+        return codes
+
+    def select(self, op: str, text: str) -> np.ndarray:
+        codes = self.matching_codes(op, text)
+        if not codes:
+            return _EMPTY
+        return np.concatenate([self.postings[code] for code in codes])
+
+    def count(self, op: str, text: str) -> int:
+        return sum(len(self.postings[code]) for code in self.matching_codes(op, text))
+
+    def test(self, op: str, text: str, rows: np.ndarray) -> np.ndarray:
+        """Mask boolean untuk baris kandidat, lewat tabel lookup per kode kategori"""
+        allowed = np.zeros(len(self.categories) + 1, dtype=bool)  # slot terakhir untuk kode -1 (NaN)
+        allowed[list(self.matching_codes(op, text))] = True
+        return allowed[self.codes[rows]]
+
+
+class NumericIndex:
+    """Nilai terurut beserta posisi barisnya; predikat rentang dijawab dengan binary search
+
+    Kolom float disimpan dalam dtype aslinya (float32) dan nilai predikat di-cast ke dtype yang sama,
+    sehingga 'temperature = 30.4' cocok dengan nilai float32 yang tersimpan sebagai 30.4.
+    """
+
+    __slots__ = ('data', 'values', 'positions')
+
+    def __init__(self, column: pd.Series):
+        # Integer (termasuk nullable Int16) exact di float64; float tetap di dtype kolomnya
+        dtype = column.dtype if isinstance(column.dtype, np.dtype) and column.dtype.kind == 'f' else np.float64
+        self.data = column.to_numpy(dtype=dtype, na_value=np.nan)
+        valid = np.flatnonzero(~np.isnan(self.data))
+        order = np.argsort(self.data[valid], kind='stable')
+        self.positions = valid[order]
+        self.values = self.data[valid][order]
+
+    def select(self, op: str, value: float) -> np.ndarray:
+        value = self.data.dtype.type(value)
+        if op == '>':
+            return self.positions[np.searchsorted(self.values, value, side='right'):]
+        if op == '>=':
+            return self.positions[np.searchsorted(self.values, value, side='left'):]
+        if op == '<':
+            return self.positions[:np.searchsorted(self.values, value, side='left')]
+        if op == '<=':
+            return self.positions[:np.searchsorted(self.values, value, side='right')]
+        left = np.searchsorted(self.values, value, side='left')
+        right = np.searchsorted(self.values, value, side='right')
+        return self.positions[left:right]
+
+    def count(self, op: str, value: float) -> int:
+        return len(self.select(op, value))
+
+    def test(self, op: str, value: float, rows: np.ndarray) -> np.ndarray:
+        """Mask boolean untuk baris kandidat (NaN selalu False)"""
+        return COMPARATORS[op](self.data[rows], self.data.dtype.type(value))
+
+
+class QueryIndex:
+    """Semua index untuk satu versi snapshot"""
+
+    __slots__ = ('version', 'size', 'columns')
+
+    def __init__(self, snapshot: WeatherSnapshot):
+        frame = snapshot.frame
+        self.version = snapshot.version
+        self.size = len(frame)
+        self.columns = {col: NumericIndex(frame[col]) for col in NUMERIC_COLUMNS if col in frame.columns}
+        self.columns.update({col: CategoryIndex(frame[col]) for col in QUERY_CATEGORICAL_COLUMNS
+                             if col in frame.columns})
+
+    def positions(self, predicates: Sequence[Predicate]) -> np.ndarray:
+        """Posisi baris (terurut) yang memenuhi semua predikat
+
+        Predikat paling selektif dijawab dari index; sisanya hanya diuji pada baris kandidatnya.
+        """
+        if not predicates:
+            return np.arange(self.size)
+        driver = min(range(len(predicates)),
+                     key=lambda i: self.columns[predicates[i].column].count(predicates[i].op, predicates[i].value))
+        rows = self.columns[predicates[driver].column].select(predicates[driver].op, predicates[driver].value)
+        for i, predicate in enumerate(predicates):
+            if i == driver or len(rows) == 0:
+                continue
+            rows = rows[self.columns[predicate.column].test(predicate.op, predicate.value, rows)]
+        return np.sort(rows)
+
+
+class WeatherQueryEngine:
+    """Menjawab query terhadap snapshot; index dibangun ulang hanya saat versi snapshot berubah"""
+
+    def __init__(self):
+        self._index: Optional[QueryIndex] = None
+        self._lock = threading.Lock()
+
+    def index_for(self, snapshot: WeatherSnapshot) -> QueryIndex:
+        index = self._index
+        if index is not None and index.version == snapshot.version:
+            return index
+        with self._lock:
+            if self._index is None or self._index.version != snapshot.version:
+                self._index = QueryIndex(snapshot)
+            return self._index
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def parse(query: str) -> Tuple[Predicate, ...]:
+        """Mengubah 'kolom op nilai AND ...' menjadi daftar Predicate (ValueError bila tidak valid)"""
+        predicates = []
+        for clause in _AND.split(query.strip()):
+            match = _CLAUSE.match(clause)
+            if not match:
+                raise ValueError(f"Kriteria tidak valid: '{clause}' (contoh: temperature > 32)")
+            column, op, value = match.group(1).lower(), match.group(2), match.group(3).strip('\'"')
+            op = '=' if op == '==' else op
+            if column in NUMERIC_COLUMNS:
+                if op not in NUMERIC_OPERATORS:
+                    raise ValueError(f"Operator '{op}' tidak didukung untuk kolom numerik {column}")
+                try:
+                    value = float(value)
+                except ValueError:
+                    raise ValueError(f"Nilai untuk {column} harus angka, bukan '{value}'")
+            elif column in QUERY_CATEGORICAL_COLUMNS:
+                if op not in CATEGORICAL_OPERATORS:
+                    raise ValueError(f"Operator '{op}' tidak didukung untuk kolom {column} (gunakan ~ atau =)")
+            else:
+                raise ValueError(f"Kolom tidak dikenal: {column}")
+            predicates.append(Predicate(column, op, value))
+        return tuple(predicates)
+
+    def positions(self, snapshot: WeatherSnapshot, query: str) -> np.ndarray:
+        """Posisi baris hasil query (tanpa membuat DataFrame)"""
+        if snapshot.is_empty:
+            return _EMPTY
+        return self.index_for(snapshot).positions(self.parse(query))
+
+    def search(self, snapshot: WeatherSnapshot, query: str) -> pd.DataFrame:
+        """Baris snapshot yang memenuhi query, urutan baris mengikuti snapshot"""
+        if snapshot.is_empty:
+            return snapshot.frame
+        return snapshot.frame.iloc[self.positions(snapshot, query)]
+
+    def search_condition(self, snapshot: WeatherSnapshot, text: str) -> pd.DataFrame:
+        """Pencarian kondisi cuaca sederhana, setara query 'condition ~ text'"""
+        if snapshot.is_empty:
+            return snapshot.frame
+        rows = self.index_for(snapshot).positions([Predicate('condition', '~', text)])
+        return snapshot.frame.iloc[rows]
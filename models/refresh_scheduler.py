@@ -0,0 +1,67 @@
+# models/refresh_scheduler.py
+"""Scheduler refresh data cuaca di background thread"""
+
+import threading
+from typing import Optional
+
+from config.config import API_CONFIG
+
+
+class RefreshScheduler:
+    """Me-refresh WeatherModel secara berkala, memprioritaskan kecamatan dengan data terlama"""
+
+    def __init__(self, model, interval: float = None, batch_size: int = None):
+        self.model = model
+        self.interval = interval if interval is not None else API_CONFIG['refresh_interval']
+        self.batch_size = batch_size if batch_size is not None else API_CONFIG['refresh_batch_size']
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.last_error: Optional[Exception] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Menjalankan scheduler di daemon thread (tidak melakukan apa-apa bila interval <= 0)"""
+        if self.interval <= 0 or self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='weather-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Menghentikan scheduler dan menunggu refresh yang sedang berjalan selesai"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self):
+        """Satu putaran refresh untuk kecamatan dengan prioritas tertinggi"""
+        priority = self.model.get_refresh_priority()
+        if self.batch_size > 0:
+            priority = priority[:self.batch_size]
+        self.model.refresh_districts(priority)
+        self.runs += 1
+
+    def _run(self):
+        # Snapshot warm start yang sudah basi diperbarui segera, tidak menunggu satu interval penuh
+        if self._has_stale_data():
+            self._run_safely()
+        while not self._stop_event.wait(self.interval):
+            self._run_safely()
+
+    def _has_stale_data(self) -> bool:
+        try:
+            return bool(self.model.get_stale_districts())
+        except Exception as e:
+            self.last_error = e
+            return False
+
+    def _run_safely(self):
+        try:
+            self.run_once()
+        except Exception as e:  # thread background tidak boleh mati karena satu kegagalan
+            self.last_error = e
@@ -0,0 +1,115 @@
+# models/statistics_engine.py
+"""Engine statistik cuaca: satu pass vektor NumPy, di-memo per versi snapshot"""
+
+import threading
+import warnings
+from typing import Callable, Dict, Hashable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from models.weather_snapshot import WeatherSnapshot
+
+NUMERIC_COLUMNS = ['temperature', 'feels_like', 'humidity', 'wind_speed',
+                   'visibility', 'pressure', 'uv_index']
+DESCRIBE_INDEX = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+GROUP_AGGREGATES = ['count', 'mean', 'min', 'max']
+
+
+class StatisticsEngine:
+    """Menghitung semua agregat sekali per versi snapshot; hasil dibagi dan tidak boleh dimutasi"""
+
+    def __init__(self, kabupaten_lookup: Mapping[str, str] = None):
+        self.kabupaten_lookup = kabupaten_lookup or {}
+        self._memo: Dict[Hashable, object] = {}
+        self._memo_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _memoize(self, snapshot: WeatherSnapshot, key: Hashable, compute: Callable[[], object]):
+        """Mengembalikan hasil yang sudah ada untuk versi snapshot ini, atau menghitungnya sekali"""
+        with self._lock:
+            if self._memo_version != snapshot.version:
+                self._memo = {}
+                self._memo_version = snapshot.version
+            if key in self._memo:
+                return self._memo[key]
+        result = compute()
+        with self._lock:
+            if self._memo_version == snapshot.version:
+                self._memo[key] = result
+        return result
+
+    @staticmethod
+    def _numeric_columns(frame: pd.DataFrame):
+        return [col for col in NUMERIC_COLUMNS if col in frame.columns]
+
+    def describe(self, snapshot: WeatherSnapshot) -> pd.DataFrame:
+        """Statistik deskriptif (setara DataFrame.describe) untuk semua kolom numerik"""
+        return self._memoize(snapshot, 'describe', lambda: self.describe_frame(snapshot.frame))
+
+    @classmethod
+    def describe_frame(cls, frame: pd.DataFrame) -> pd.DataFrame:
+        """Statistik deskriptif tanpa memo untuk DataFrame sembarang"""
+        columns = cls._numeric_columns(frame)
+        if frame.empty or not columns:
+            return pd.DataFrame(index=DESCRIBE_INDEX)
+
+        block = frame[columns].to_numpy(dtype=np.float64)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # kolom yang seluruhnya NaN
+            count = np.count_nonzero(~np.isnan(block), axis=0)
+            q25, q50, q75 = np.nanpercentile(block, [25, 50, 75], axis=0)
+            values = np.vstack([
+                count,
+                np.nanmean(block, axis=0),
+                np.nanstd(block, axis=0, ddof=1),
+                np.nanmin(block, axis=0),
+                q25, q50, q75,
+                np.nanmax(block, axis=0)
+            ])
+        return pd.DataFrame(values, index=DESCRIBE_INDEX, columns=columns)
+
+    def summary(self, snapshot: WeatherSnapshot) -> Dict:
+        """Ringkasan per kolom: mean, min, max, std, median"""
+        def compute():
+            table = self.describe(snapshot)
+            return {
+                col: {
+                    'mean': table.at['mean', col],
+                    'min': table.at['min', col],
+                    'max': table.at['max', col],
+                    'std': table.at['std', col],
+                    'median': table.at['50%', col]
+                }
+                for col in table.columns
+            }
+        return self._memoize(snapshot, 'summary', compute)
+
+    def condition_counts(self, snapshot: WeatherSnapshot) -> pd.Series:
+        """Jumlah kecamatan per kondisi cuaca, terurut dari yang paling sering"""
+        def compute():
+            frame = snapshot.frame
+            if frame.empty:
+                return pd.Series(dtype='int64')
+            counts = frame['condition'].value_counts()
+            return counts[counts > 0]
+        return self._memoize(snapshot, 'condition_counts', compute)
+
+    def grouped(self, snapshot: WeatherSnapshot, by: str) -> pd.DataFrame:
+        """Agregat per kelompok ('kabupaten' atau 'condition') untuk semua kolom numerik"""
+        if by not in ('kabupaten', 'condition'):
+            raise ValueError(f"Pengelompokan tidak didukung: {by}")
+        return self._memoize(snapshot, ('grouped', by), lambda: self._grouped(snapshot.frame, by))
+
+    def _grouped(self, frame: pd.DataFrame, by: str) -> pd.DataFrame:
+        columns = self._numeric_columns(frame)
+        if frame.empty or not columns:
+            return pd.DataFrame()
+
+        if by == 'kabupaten':
+            keys = pd.Index(frame.index.map(lambda d: self.kabupaten_lookup.get(d, d)), name='kabupaten')
+        else:
+            keys = pd.Index(frame['condition'].astype(str), name='condition')
+
+        block = pd.DataFrame(frame[columns].to_numpy(dtype=np.float64), columns=columns)
+        return block.groupby(keys.to_numpy(), sort=True).agg(GROUP_AGGREGATES).rename_axis(by)
@@ -1,35 +1,82 @@
 # models/weather_data.py
-from dataclasses import dataclass
-from typing import Dict
+from typing import Any, Dict, Tuple
+
+FIELDS = ('location', 'district', 'temperature', 'feels_like', 'humidity', 'wind_speed',
+          'wind_direction', 'condition', 'visibility', 'pressure', 'uv_index', 'last_updated',
+          'last_updated_epoch')
+
 
-@dataclass
 class WeatherData:
-    """Data class untuk menyimpan informasi cuaca"""
-    location: str
-    district: str
-    temperature: float
-    feels_like: float
-    humidity: int
-    wind_speed: float
-    wind_direction: str
-    condition: str
-    visibility: float
-    pressure: float
-    uv_index: float
-    last_updated: str
-    
+    """Satu record cuaca; memakai __slots__ sehingga tidak ada __dict__ per instance"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, location: str, district: str, temperature: float, feels_like: float,
+                 humidity: int, wind_speed: float, wind_direction: str, condition: str,
+                 visibility: float, pressure: float, uv_index: float, last_updated: str,
+                 last_updated_epoch: int = None):
+        self.location = location
+        self.district = district
+        self.temperature = temperature
+        self.feels_like = feels_like
+        self.humidity = humidity
+        self.wind_speed = wind_speed
+        self.wind_direction = wind_direction
+        self.condition = condition
+        self.visibility = visibility
+        self.pressure = pressure
+        self.uv_index = uv_index
+        self.last_updated = last_updated
+        # last_updated adalah jam lokal lokasi tanpa zona waktu; epoch dipakai untuk perbandingan waktu absolut
+        self.last_updated_epoch = last_updated_epoch
+
+    @classmethod
+    def from_api(cls, district: str, data: Dict) -> 'WeatherData':
+        """Mengambil hanya field yang dipakai dari response JSON WeatherAPI (KeyError bila tidak lengkap)"""
+        current = data['current']
+        return cls(
+            data['location']['name'],
+            district,
+            current['temp_c'],
+            current['feelslike_c'],
+            current['humidity'],
+            current['wind_kph'],
+            current['wind_dir'],
+            current['condition']['text'],
+            current['vis_km'],
+            current['pressure_mb'],
+            current['uv'],
+            current['last_updated'],
+            current.get('last_updated_epoch')
+        )
+
+    @classmethod
+    def from_tuple(cls, values: Tuple) -> 'WeatherData':
+        return cls(*values)
+
+    def to_tuple(self) -> Tuple:
+        """Nilai field sesuai urutan FIELDS"""
+        return (self.location, self.district, self.temperature, self.feels_like, self.humidity,
+                self.wind_speed, self.wind_direction, self.condition, self.visibility,
+                self.pressure, self.uv_index, self.last_updated, self.last_updated_epoch)
+
     def to_dict(self) -> Dict:
-        return {
-            'location': self.location,
-            'district': self.district,
-            'temperature': self.temperature,
-            'feels_like': self.feels_like,
-            'humidity': self.humidity,
-            'wind_speed': self.wind_speed,
-            'wind_direction': self.wind_direction,
-            'condition': self.condition,
-            'visibility': self.visibility,
-            'pressure': self.pressure,
-            'uv_index': self.uv_index,
-            'last_updated': self.last_updated
-        }
\ No newline at end of file
+        return dict(zip(FIELDS, self.to_tuple()))
+
+    def __getitem__(self, key: str) -> Any:
+        """Akses gaya dict (record['temperature']) agar kompatibel dengan kode yang memakai record dict"""
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, WeatherData):
+            return NotImplemented
+        return self.to_tuple() == other.to_tuple()
+
+    def __reduce__(self):
+        return (WeatherData, self.to_tuple())
+
+    def __repr__(self) -> str:
+        return f"WeatherData({self.district!r}, {self.temperature}°C, {self.condition!r})"
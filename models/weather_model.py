@@ -1,99 +1,410 @@
 # models/weather_model.py
+import functools
+import inspect
 import pandas as pd
 import threading
-import os  # <-- 1. Impor modul os
+import time
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from services.weather_api import WeatherAPIService
+from services.district_registry import District
+from services.async_fetcher import AIOHTTP_AVAILABLE
+from services.sharded_fetcher import ShardedWeatherFetcher
+from services.snapshot_store import SnapshotStore
+from services.history_store import HistoryStore
+from services.export_service import ExportService
+from services.single_flight import SingleFlight
+from models.frame_builder import WeatherFrameBuilder
+from models.weather_data import WeatherData
+from models.weather_snapshot import WeatherSnapshot
+from models.statistics_engine import StatisticsEngine
+from models.query_engine import WeatherQueryEngine
+from services.metrics import (LAST_REFRESH, PERSIST_SECONDS, REFRESH_DISTRICTS, REFRESH_SECONDS,
+                              REGISTRY, SNAPSHOT_ROWS)
+from config.config import API_CONFIG, FILE_CONFIG, METRICS_CONFIG
+
+# Key single-flight untuk refresh semua kecamatan (engine apa pun)
+FULL_REFRESH = 'full'
+
+
+def _coalesced_refresh(method):
+    """Refresh penuh yang dipanggil bersamaan dijalankan sekali; pemanggil lain berbagi DataFrame hasilnya
+    
+    Semua engine memakai key FULL_REFRESH karena hasilnya sama (seluruh kecamatan), sehingga argumen tuning
+    pemanggil yang bergabung (max_workers, batch_size, concurrency, processes, verbose) tidak dipakai.
+    on_update milik pemanggil yang bergabung tetap dipanggil sekali dengan hasil bersama.
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        executed = []
+        
+        def run():
+            executed.append(True)
+            return method(self, *args, **kwargs)
+        
+        weather_df = self.refresh_flight.do(FULL_REFRESH, run)
+        on_update = signature.bind(self, *args, **kwargs).arguments.get('on_update')
+        if on_update and not executed:
+            on_update(self.weather_df, len(weather_df), len(self.api_service.districts))
+        return weather_df
+    return wrapper
 
 class WeatherModel:
     """Model untuk mengelola data cuaca menggunakan Pandas"""
     
     def __init__(self, api_key: str):
         self.api_service = WeatherAPIService(api_key)
-        self.weather_df: pd.DataFrame = pd.DataFrame()
-        self.lock = threading.Lock()
+        # Snapshot immutable; refresh menukar referensinya secara atomik
+        self.snapshot: WeatherSnapshot = WeatherSnapshot.empty()
+        self.stats_engine = StatisticsEngine(
+            {district.key: district.kabupaten for district in self.api_service.registry}
+        )
+        self.query_engine = WeatherQueryEngine()
+        self.refresh_progress: Optional[Tuple[int, int]] = None
+        self.snapshot_store = SnapshotStore()
+        self.history_store = HistoryStore()
+        self.export_service = ExportService()
+        # Menjaga agar hanya satu refresh (manual atau terjadwal) berjalan pada satu waktu
+        self.refresh_lock = threading.Lock()
+        # Refresh identik yang datang bersamaan (menu, scheduler, server) berbagi satu fan-out ke API
+        self.refresh_flight = SingleFlight('refresh')
+    
+    @property
+    def weather_df(self) -> pd.DataFrame:
+        """DataFrame snapshot saat ini (dibagi, jangan dimutasi)"""
+        return self.snapshot.frame
     
-    def fetch_all_weather_data_threaded(self, max_workers: int = 5) -> pd.DataFrame:
-        """Mengambil data cuaca untuk semua kecamatan menggunakan threading"""
-        weather_data_list = self.api_service.fetch_all_weather_data_threaded(max_workers)
+    @property
+    def fetched_at(self) -> Optional[datetime]:
+        return self.snapshot.fetched_at
+    
+    @_coalesced_refresh
+    def fetch_all_weather_data(self, verbose: bool = True) -> pd.DataFrame:
+        """Mengambil data cuaca semua kecamatan dengan engine sesuai API_CONFIG['fetch_engine']"""
+        engine = self._fetch_engine()
+        total = len(self.api_service.registry)
+        with REFRESH_SECONDS.time(engine=engine):
+            if engine == 'bulk':
+                weather_df = self.fetch_all_weather_data_bulk(verbose=verbose)
+            elif engine == 'async':
+                weather_df = self.fetch_all_weather_data_async(verbose=verbose)
+            elif engine == 'sharded':
+                weather_df = self.fetch_all_weather_data_sharded(verbose=verbose)
+            else:
+                weather_df = self.fetch_all_weather_data_threaded(verbose=verbose)
+        self._record_refresh(len(weather_df), total)
+        return weather_df
+    
+    @_coalesced_refresh
+    def fetch_all_weather_data_threaded(self, max_workers: int = None,
+                                        on_update: Callable[[pd.DataFrame, int, int], None] = None,
+                                        verbose: bool = True) -> pd.DataFrame:
+        """Mengambil data cuaca dengan threading; snapshot diperbarui bertahap selama fetch berjalan
         
-        # Konversi ke DataFrame
-        with self.lock:
-            self.weather_df = pd.DataFrame(weather_data_list)
-            if not self.weather_df.empty:
-                # Set district sebagai index untuk akses mudah
-                self.weather_df.set_index('district', inplace=True)
-                # Convert numeric columns
-                numeric_cols = ['temperature', 'feels_like', 'humidity', 'wind_speed', 
-                                'visibility', 'pressure', 'uv_index']
-                for col in numeric_cols:
-                    if col in self.weather_df.columns:
-                        self.weather_df[col] = pd.to_numeric(self.weather_df[col], errors='coerce')
-                
-                # Convert datetime
-                self.weather_df['last_updated'] = pd.to_datetime(self.weather_df['last_updated'])
+        Kecamatan yang gagal diambil tetap memakai data lama, baik di snapshot parsial maupun final.
+        Mengembalikan data yang berhasil diambil pada refresh ini.
+        """
+        if verbose:
+            print("Mengambil data cuaca untuk seluruh Jawa Timur...")
+        total = len(self.api_service.districts)
+        builder = WeatherFrameBuilder(total)
+        
+        with self.refresh_lock:
+            previous_df = self.weather_df
+            records = self.api_service.iter_weather_data_threaded(max_workers, verbose=verbose)
+            self._stream_into(builder, records, previous_df, total, on_update)
+            
+            if verbose:
+                print(f"\nSelesai! Berhasil mengambil data {builder.size} kecamatan")
+                self.api_service.print_fetch_stats()
+            fresh_df = builder.build()
+            weather_df = self._publish_fresh(previous_df, fresh_df)
         
-        return self.weather_df
+        if on_update:
+            on_update(weather_df, builder.size, total)
+        return fresh_df
     
-    def get_weather_dataframe(self) -> pd.DataFrame:
-        """Mendapatkan DataFrame cuaca"""
-        with self.lock:
-            return self.weather_df.copy()
+    def refresh_districts(self, districts: List[str], verbose: bool = False) -> pd.DataFrame:
+        """Mengambil ulang sebagian kecamatan (sesuai urutan prioritas) dan menggabungkannya ke snapshot"""
+        targets = [self.api_service.districts[name] for name in districts if name in self.api_service.districts]
+        if not targets:
+            return self.weather_df
+        
+        # Refresh penuh yang sedang berjalan sudah mencakup semua kecamatan: tunggu dan pakai hasilnya
+        joined, _ = self.refresh_flight.join(FULL_REFRESH)
+        if joined:
+            return self.weather_df
+        key = ('partial', tuple(sorted(district.key for district in targets)))
+        return self.refresh_flight.do(key, lambda: self._refresh_targets(targets, verbose))
     
-    def get_weather_data(self, district: str = None) -> Optional[pd.Series]:
-        """Mendapatkan data cuaca untuk kecamatan tertentu"""
-        with self.lock:
-            if district and district in self.weather_df.index:
-                return self.weather_df.loc[district]
-            return None
+    def _refresh_targets(self, targets: List[District], verbose: bool) -> pd.DataFrame:
+        with self.refresh_lock, REFRESH_SECONDS.time(engine='partial'):
+            # Sama seperti refresh penuh: hasil dipublikasikan bertahap dan progress terlihat di view
+            previous_df = self.weather_df
+            builder = WeatherFrameBuilder(len(targets))
+            records = self._fetch_records(self._fetch_engine(), targets, verbose)
+            self._stream_into(builder, records, previous_df, len(targets))
+            
+            fresh_df = builder.build()
+            weather_df = self._publish_fresh(previous_df, fresh_df)
+        self._record_refresh(len(fresh_df), len(targets))
+        return weather_df
     
-    def export_to_csv(self, filename: str = None) -> Optional[str]:
-        """Export data ke file CSV di dalam folder 'data'."""
+    @staticmethod
+    def _fetch_engine() -> str:
+        """Engine fetch dari API_CONFIG['fetch_engine']; async turun ke threaded bila aiohttp tidak tersedia"""
+        engine = API_CONFIG['fetch_engine']
+        if engine == 'async' and not AIOHTTP_AVAILABLE:
+            print("aiohttp tidak tersedia, menggunakan engine threaded")
+            engine = 'threaded'
+        return engine
+    
+    def _fetch_records(self, engine: str, districts: List[District], verbose: bool) -> Iterable[WeatherData]:
+        """Record cuaca sebagian kecamatan lewat engine terpilih; threaded mengalir, engine lain per batch"""
+        if engine == 'bulk':
+            return self.api_service.fetch_all_weather_data_bulk(districts=districts, verbose=verbose)
+        if engine == 'async':
+            return self.api_service.fetch_all_weather_data_async(districts=districts, verbose=verbose)
+        if engine == 'sharded':
+            return ShardedWeatherFetcher(self.api_service).run(districts, verbose=verbose).records()
+        return self.api_service.iter_weather_data_threaded(districts=districts, verbose=verbose)
+    
+    def get_refresh_priority(self) -> List[str]:
+        """Urutan kecamatan untuk di-refresh: yang belum ada data dulu, lalu last_updated terlama"""
+        weather_df = self.weather_df
+        if weather_df.empty:
+            return list(self.api_service.districts)
+        
+        missing = [d for d in self.api_service.districts if d not in weather_df.index]
+        # Baris segar selalu digabung di depan, jadi dibalik agar yang paling lama tidak di-fetch menang saat seri;
+        # last_updated kosong (NaT) berarti belum pernah ada data valid, jadi didahulukan
+        oldest_first = weather_df['last_updated'].iloc[::-1].sort_values(kind='stable', na_position='first').index
+        return missing + [d for d in oldest_first if d in self.api_service.districts]
+    
+    @staticmethod
+    def _merge(previous_df: pd.DataFrame, fresh_df: pd.DataFrame) -> pd.DataFrame:
+        """DataFrame baru: baris segar menggantikan baris lama dengan district yang sama"""
+        if previous_df.empty:
+            return fresh_df
+        remaining = previous_df.drop(fresh_df.index, errors='ignore')
+        return pd.concat([fresh_df, remaining]) if not remaining.empty else fresh_df
+    
+    def _stream_into(self, builder: WeatherFrameBuilder, records: Iterable[WeatherData], previous_df: pd.DataFrame,
+                     total: int, on_update: Callable[[pd.DataFrame, int, int], None] = None):
+        """Mengisi builder dari record yang mengalir sambil mempublikasikan snapshot parsial secara berkala"""
+        self.refresh_progress = (0, total)
+        last_publish = time.monotonic()
+        try:
+            for record in records:
+                builder.append(record)
+                if time.monotonic() - last_publish >= API_CONFIG['stream_publish_interval']:
+                    self._publish_partial(previous_df, builder.build(), total, on_update)
+                    last_publish = time.monotonic()
+        finally:
+            self.refresh_progress = None
+    
+    def _publish_partial(self, previous_df: pd.DataFrame, partial_df: pd.DataFrame, total: int,
+                         on_update: Callable[[pd.DataFrame, int, int], None] = None):
+        """Menggabungkan hasil parsial dengan data lama untuk kecamatan yang belum selesai"""
+        merged_df = self._merge(previous_df, partial_df)
         
-        folder_name = "data"
+        # Penukaran referensi bersifat atomik; pembaca melihat versi lama atau baru secara utuh
+        self.snapshot = WeatherSnapshot(merged_df, self.snapshot.fetched_at)
+        self.refresh_progress = (len(partial_df), total)
+        if on_update:
+            on_update(merged_df, len(partial_df), total)
+    
+    @_coalesced_refresh
+    def fetch_all_weather_data_async(self, concurrency: int = None, verbose: bool = True) -> pd.DataFrame:
+        """Mengambil data cuaca untuk semua kecamatan menggunakan asyncio"""
+        weather_data_list = self.api_service.fetch_all_weather_data_async(concurrency, verbose=verbose)
+        return self._update_dataframe(weather_data_list)
+    
+    @_coalesced_refresh
+    def fetch_all_weather_data_bulk(self, batch_size: int = None, verbose: bool = True) -> pd.DataFrame:
+        """Mengambil data cuaca untuk semua kecamatan menggunakan request bulk"""
+        weather_data_list = self.api_service.fetch_all_weather_data_bulk(batch_size, verbose=verbose)
+        return self._update_dataframe(weather_data_list)
+    
+    @_coalesced_refresh
+    def fetch_all_weather_data_sharded(self, processes: int = None, verbose: bool = True) -> pd.DataFrame:
+        """Mengambil data cuaca dengan registry dipecah ke beberapa proses (untuk ribuan kecamatan)"""
+        if verbose:
+            print("Mengambil data cuaca untuk seluruh Jawa Timur (sharded)...")
+        builder = ShardedWeatherFetcher(self.api_service, processes).run(verbose=verbose)
+        if verbose:
+            print(f"\nSelesai! Berhasil mengambil data {builder.size} dari {len(self.api_service.registry)} kecamatan")
         
-        os.makedirs(folder_name, exist_ok=True)
+        fresh_df = builder.build()
+        with self.refresh_lock:
+            self._publish_fresh(self.weather_df, fresh_df)
+        return fresh_df
+    
+    def _update_dataframe(self, weather_data_list: List[WeatherData]) -> pd.DataFrame:
+        """Menggabungkan hasil fetch terbaru ke snapshot; mengembalikan data yang berhasil diambil"""
+        # Bangun DataFrame bertipe langsung dari record (tanpa konversi per kolom)
+        builder = WeatherFrameBuilder(len(weather_data_list))
+        builder.extend(weather_data_list)
         
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"cuaca_jatim_{timestamp}.csv"
+        fresh_df = builder.build()
+        with self.refresh_lock:
+            self._publish_fresh(self.weather_df, fresh_df)
+        return fresh_df
+    
+    def _publish_fresh(self, previous_df: pd.DataFrame, fresh_df: pd.DataFrame) -> pd.DataFrame:
+        """Dipakai semua engine: hasil refresh menggantikan baris lamanya, kecamatan yang gagal tetap memakai
+        data lama, dan refresh tanpa hasil sama sekali tidak mengubah snapshot (dipanggil di bawah refresh_lock)"""
+        weather_df = self._merge(previous_df, fresh_df)
+        if not fresh_df.empty:
+            self._publish(weather_df, fresh_df)
+        return weather_df
+    
+    def _publish(self, weather_df: pd.DataFrame, fresh_df: pd.DataFrame):
+        """Mempublikasikan snapshot yang sudah jadi lalu menyimpannya ke snapshot dan histori"""
+        if weather_df.empty:
+            return  # frame kosong tidak pernah menggantikan snapshot yang sedang disajikan
         
-        file_path = os.path.join(folder_name, filename)
+        self.snapshot = WeatherSnapshot(weather_df, datetime.now())
+        self._save_snapshot(weather_df)
+        self._append_history(fresh_df)
+    
+    def _record_refresh(self, succeeded: int, requested: int):
+        """Mencatat hasil refresh ke metrik dan menulis file eksposisi bila dikonfigurasi"""
+        REFRESH_DISTRICTS.inc(succeeded, result='success')
+        REFRESH_DISTRICTS.inc(requested - succeeded, result='failed')
+        SNAPSHOT_ROWS.set(len(self.snapshot))
+        if self.fetched_at:
+            LAST_REFRESH.set(self.fetched_at.timestamp())
+        self.write_metrics()
+    
+    def write_metrics(self) -> Optional[str]:
+        """Menulis metrik (format teks Prometheus) ke METRICS_CONFIG['textfile']"""
+        file_path = METRICS_CONFIG['textfile']
+        if not file_path:
+            return None
+        try:
+            REGISTRY.write_textfile(file_path)
+        except OSError as e:
+            print(f"Gagal menulis metrik: {e}")
+            return None
+        return file_path
+    
+    def get_metrics_text(self) -> str:
+        """Eksposisi semua metrik dalam format teks Prometheus"""
+        return REGISTRY.render()
+    
+    def _save_snapshot(self, weather_df: pd.DataFrame):
+        """Menyimpan snapshot terakhir ke disk (kegagalan tidak menghentikan aplikasi)"""
+        try:
+            with PERSIST_SECONDS.time(target='snapshot'):
+                self.snapshot_store.save(weather_df, self.fetched_at)
+        except OSError as e:
+            print(f"Gagal menyimpan snapshot: {e}")
+    
+    def _append_history(self, fresh_df: pd.DataFrame):
+        """Menambahkan hasil refresh ke penyimpanan histori"""
+        if not FILE_CONFIG['history_enabled']:
+            return
+        try:
+            with PERSIST_SECONDS.time(target='history'):
+                self.history_store.append(fresh_df, self.fetched_at)
+        except (OSError, ValueError) as e:
+            print(f"Gagal menyimpan histori: {e}")
+    
+    def get_history(self, districts: List[str] = None, start: datetime = None,
+                    end: datetime = None, columns: List[str] = None) -> pd.DataFrame:
+        """Mendapatkan histori cuaca untuk kecamatan, rentang waktu, dan kolom tertentu"""
+        return self.history_store.query(districts, start, end, columns)
+    
+    def load_snapshot(self) -> bool:
+        """Memuat snapshot terakhir dari disk untuk warm start"""
+        snapshot = self.snapshot_store.load()
+        if snapshot is None:
+            return False
         
-        with self.lock:
-            if not self.weather_df.empty:
-                # Reset index untuk export
-                export_df = self.weather_df.reset_index()
-                
-                export_df.to_csv(file_path, index=False, encoding='utf-8')
-                
-                return file_path
+        weather_df, fetched_at = snapshot
+        self.snapshot = WeatherSnapshot(weather_df, fetched_at)
+        return not weather_df.empty
+    
+    def get_stale_districts(self) -> List[str]:
+        """Kecamatan yang belum ada datanya, waktu update-nya tidak diketahui, atau sudah melewati batas basi"""
+        weather_df = self.weather_df
+        if weather_df.empty:
+            return list(self.api_service.districts)
         
-        return None
+        # Dibandingkan lewat epoch karena last_updated adalah jam lokal lokasi, bukan jam host;
+        # snapshot lama tanpa kolom epoch dianggap basi seluruhnya
+        threshold = time.time() - FILE_CONFIG['snapshot_stale_after']
+        if 'last_updated_epoch' in weather_df.columns:
+            fresh = (weather_df['last_updated_epoch'] >= threshold).fillna(False).to_numpy(dtype=bool)
+            stale = weather_df.index[~fresh]
+        else:
+            stale = weather_df.index
+        missing = [d for d in self.api_service.districts if d not in weather_df.index]
+        return list(stale) + missing
+    
+    def get_snapshot(self) -> WeatherSnapshot:
+        """Mendapatkan snapshot saat ini tanpa menyalin data"""
+        return self.snapshot
+    
+    def get_weather_dataframe(self) -> pd.DataFrame:
+        """Mendapatkan DataFrame cuaca (dibagi tanpa salinan; gunakan get_snapshot().to_mutable() untuk mengubah)"""
+        return self.snapshot.frame
+    
+    def get_weather_data(self, district: str = None) -> Optional[pd.Series]:
+        """Mendapatkan data cuaca untuk kecamatan tertentu"""
+        return self.snapshot.get(district)
+    
+    def export_data(self, fmt: str = 'csv', filename: str = None, columns: List[str] = None,
+                    mode: str = 'overwrite', partition_by: List[str] = None) -> Optional[str]:
+        """Export data ke folder 'data' dalam format csv, csv.gz, csv.zst, parquet atau feather"""
+        weather_df = self.weather_df
+        if weather_df.empty:
+            return None
+        return self.export_service.export(weather_df, fmt, filename, columns, mode, partition_by)
+    
+    def export_to_csv(self, filename: str = None) -> Optional[str]:
+        """Export data ke file CSV di dalam folder 'data'."""
+        return self.export_data('csv', filename)
     
     def get_statistics(self) -> Dict:
-        """Mendapatkan statistik cuaca"""
-        with self.lock:
-            if self.weather_df.empty:
-                return {}
-            
-            numeric_cols = ['temperature', 'feels_like', 'humidity', 'wind_speed', 
-                            'visibility', 'pressure', 'uv_index']
-            stats = {}
-            
-            for col in numeric_cols:
-                if col in self.weather_df.columns:
-                    stats[col] = {
-                        'mean': self.weather_df[col].mean(),
-                        'min': self.weather_df[col].min(),
-                        'max': self.weather_df[col].max(),
-                        'std': self.weather_df[col].std(),
-                        'median': self.weather_df[col].median()
-                    }
-            
-            return stats
+        """Mendapatkan statistik cuaca (dihitung sekali per versi snapshot)"""
+        return self.stats_engine.summary(self.snapshot)
+    
+    def get_statistics_table(self) -> pd.DataFrame:
+        """Mendapatkan tabel statistik deskriptif semua kolom numerik"""
+        return self.stats_engine.describe(self.snapshot)
+    
+    def get_condition_counts(self) -> pd.Series:
+        """Mendapatkan jumlah kecamatan per kondisi cuaca"""
+        return self.stats_engine.condition_counts(self.snapshot)
+    
+    def get_grouped_statistics(self, by: str) -> pd.DataFrame:
+        """Mendapatkan statistik per kelompok ('kabupaten' atau 'condition')"""
+        return self.stats_engine.grouped(self.snapshot, by)
+    
+    def search_weather(self, query: str) -> pd.DataFrame:
+        """Mencari kecamatan dengan query multi-kriteria, misal 'temperature > 32 AND condition ~ rain'"""
+        return self.query_engine.search(self.snapshot, query)
+    
+    def search_by_condition(self, condition: str) -> pd.DataFrame:
+        """Mencari kecamatan yang kondisinya memuat kata tertentu (memakai inverted index)"""
+        return self.query_engine.search_condition(self.snapshot, condition)
+    
+    def get_kabupaten_lookup(self) -> Dict[str, str]:
+        """Pemetaan key kecamatan ke kabupaten"""
+        return self.stats_engine.kabupaten_lookup
     
     def get_districts(self) -> Dict:
         """Mendapatkan daftar kecamatan dari API service"""
-        return self.api_service.districts
\ No newline at end of file
+        return self.api_service.districts
+    
+    def get_cache_stats(self) -> Dict:
+        """Mendapatkan statistik hit/miss cache response API"""
+        return self.api_service.cache.stats()
+    
+    def get_refresh_progress(self) -> Optional[Tuple[int, int]]:
+        """Progress refresh yang sedang berjalan (selesai, total), None bila tidak ada"""
+        return self.refresh_progress
\ No newline at end of file
@@ -0,0 +1,58 @@
+# models/weather_snapshot.py
+"""Snapshot data cuaca yang immutable dan berversi, dibagi ke semua pembaca tanpa salinan"""
+
+import itertools
+from datetime import datetime
+from typing import Optional, Tuple
+
+import pandas as pd
+
+# Copy-on-Write sudah default di pandas 3; versi lama perlu diaktifkan agar
+# turunan dari frame bersama tidak pernah menulis balik ke snapshot
+if int(pd.__version__.split('.')[0]) < 3 and hasattr(pd.options.mode, 'copy_on_write'):
+    pd.options.mode.copy_on_write = True
+
+_versions = itertools.count(1)
+
+
+class WeatherSnapshot:
+    """Satu versi DataFrame cuaca; jangan dimutasi, gunakan to_mutable() bila perlu mengubah data"""
+
+    __slots__ = ('version', 'frame', 'fetched_at', '_districts')
+
+    def __init__(self, frame: pd.DataFrame, fetched_at: Optional[datetime] = None):
+        self.version = next(_versions)
+        self.frame = frame
+        self.fetched_at = fetched_at
+        self._districts: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def empty(cls) -> 'WeatherSnapshot':
+        return cls(pd.DataFrame())
+
+    @property
+    def is_empty(self) -> bool:
+        return self.frame.empty
+
+    @property
+    def districts(self) -> Tuple[str, ...]:
+        """Daftar kecamatan (dihitung sekali per snapshot)"""
+        if self._districts is None:
+            self._districts = tuple(self.frame.index)
+        return self._districts
+
+    def get(self, district: str) -> Optional[pd.Series]:
+        """Baris data satu kecamatan, None bila tidak ada"""
+        if district and district in self.frame.index:
+            return self.frame.loc[district]
+        return None
+
+    def to_mutable(self) -> pd.DataFrame:
+        """Salinan penuh untuk pemanggil yang memang perlu memodifikasi data"""
+        return self.frame.copy()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __repr__(self) -> str:
+        return f"WeatherSnapshot(version={self.version}, rows={len(self.frame)})"
@@ -1,6 +1,13 @@
 """Services package untuk weather info system"""
 
-from .weather_api import WeatherAPIService
-from .plot_service import PlotService
+from utils.helpers import lazy_exports
+
+# Di-import saat pertama dipakai agar plotting (matplotlib/seaborn) tidak ikut dimuat saat startup
+_EXPORTS = {
+    'WeatherAPIService': '.weather_api',
+    'PlotService': '.plot_service'
+}
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = ['WeatherAPIService', 'PlotService']
\ No newline at end of file
@@ -0,0 +1,101 @@
+# services/async_fetcher.py
+"""Engine asyncio untuk mengambil data cuaca banyak lokasi secara konkuren"""
+
+import asyncio
+import time
+from typing import Iterable, List, Optional
+
+from config.config import API_CONFIG
+from services.district_registry import District
+from services.json_codec import loads
+from services.metrics import (API_RATE_LIMIT_WAIT, API_REQUEST_SECONDS, API_RESPONSE_BYTES,
+                              API_RESPONSES, API_RETRIES, PARSE_SECONDS)
+from models.weather_data import WeatherData
+from utils.helpers import is_module_available
+
+# aiohttp opsional dan baru di-import saat engine async benar-benar dipakai
+AIOHTTP_AVAILABLE = is_module_available('aiohttp')
+
+
+class AsyncWeatherFetcher:
+    """Fetcher asyncio dengan satu client HTTP bersama dan semaphore pembatas konkurensi"""
+
+    def __init__(self, api_service, concurrency: int = None, verbose: bool = True):
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp diperlukan untuk engine async (pip install aiohttp)")
+        self.api_service = api_service
+        self.transport = api_service.transport
+        self.concurrency = concurrency or API_CONFIG['async_concurrency']
+        self.verbose = verbose
+
+    async def _fetch_one(self, session, semaphore: asyncio.Semaphore,
+                         district: District) -> Optional[WeatherData]:
+        """Mengambil dan mem-parse data satu kecamatan dengan retry/backoff"""
+        import aiohttp
+        params = self.api_service.build_params(district)
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                API_RATE_LIMIT_WAIT.inc(await self.transport.rate_limiter.async_acquire())
+                async with semaphore, self.transport.concurrency.async_slot():
+                    start = time.perf_counter()
+                    async with session.get(self.api_service.base_url, params=params) as response:
+                        latency = time.perf_counter() - start
+                        self.transport.concurrency.record(latency, overloaded=response.status == 429)
+                        API_REQUEST_SECONDS.observe(latency, method='GET', client='aiohttp')
+                        API_RESPONSES.inc(method='GET', status=response.status)
+                        if (response.status in self.transport.retry_statuses
+                                and attempt < self.transport.max_retries):
+                            retry_after = response.headers.get('Retry-After')
+                            API_RETRIES.inc(reason=str(response.status))
+                        else:
+                            response.raise_for_status()
+                            body = await response.read()
+                            API_RESPONSE_BYTES.inc(len(body), method='GET')
+                            with PARSE_SECONDS.time(kind='single'):
+                                return self.api_service.handle_response(district, loads(body))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                status = 'timeout' if isinstance(e, asyncio.TimeoutError) else 'connection_error'
+                if status == 'timeout':
+                    self.transport.concurrency.record(self.transport.timeout, overloaded=True)
+                    API_REQUEST_SECONDS.observe(self.transport.timeout, method='GET', client='aiohttp')
+                API_RESPONSES.inc(method='GET', status=status)
+                if attempt >= self.transport.max_retries:
+                    self._report('fetching', district, e)
+                    return None
+                API_RETRIES.inc(reason=status)
+            except aiohttp.ClientResponseError as e:
+                self._report('fetching', district, e)
+                return None
+            except (KeyError, ValueError) as e:
+                self._report('parsing', district, e)
+                return None
+
+            # Tidur di luar semaphore agar slot bisa dipakai request lain
+            await asyncio.sleep(self.transport.backoff_delay(attempt, retry_after))
+            attempt += 1
+
+    def _report(self, action: str, district: District, error: Exception):
+        if self.verbose:
+            print(f"Error {action} data for {district.key}: {error}")
+
+    async def fetch_all(self, districts: Iterable[District]) -> List[WeatherData]:
+        """Mengambil data semua kecamatan dengan konkurensi terbatas"""
+        import aiohttp
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.transport.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            tasks = [
+                self._fetch_one(session, semaphore, district)
+                for district in districts
+            ]
+            results = await asyncio.gather(*tasks)
+
+        return [result for result in results if result]
+
+    def run(self, districts: Iterable[District]) -> List[WeatherData]:
+        """Menjalankan fetch_all dari kode sinkron"""
+        return asyncio.run(self.fetch_all(districts))
@@ -0,0 +1,111 @@
+# services/district_registry.py
+"""Registry kecamatan yang dimuat dari file data dengan index lookup"""
+
+import csv
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from config.config import API_CONFIG, FILE_CONFIG
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class District:
+    """Satu kecamatan; string kabupaten/provinsi di-intern sehingga dipakai bersama
+
+    key adalah nama tampilan unik yang dipakai sebagai index DataFrame dan route HTTP: nama kecamatan
+    dengan kabupaten di belakangnya (misal 'Wonosari (Gunungkidul)'), kecuali namanya sama dengan kabupaten.
+    """
+
+    __slots__ = ('id', 'name', 'kabupaten', 'province', 'country', 'lat', 'lon', 'query', 'key')
+
+    def __init__(self, district_id: int, name: str, kabupaten: str, province: str,
+                 country: str, lat: Optional[float] = None, lon: Optional[float] = None):
+        self.id = district_id
+        self.name = name
+        self.kabupaten = kabupaten
+        self.province = province
+        self.country = country
+        self.lat = lat
+        self.lon = lon
+        self.key = name if name == kabupaten else sys.intern(f"{name} ({kabupaten})")
+        # Query API dibuat sekali saat load, bukan per request
+        if API_CONFIG['query_by_coordinates'] and lat is not None and lon is not None:
+            self.query = f"{lat},{lon}"
+        else:
+            self.query = f"{name}, {province}, {country}"
+
+    def __repr__(self) -> str:
+        return f"District({self.id}, {self.name!r}, {self.kabupaten!r})"
+
+
+class DistrictRegistry:
+    """Kumpulan kecamatan ber-primary key id, dengan index key tampilan, nama (tidak unik), dan kabupaten"""
+
+    def __init__(self, districts: List[District] = None):
+        self.by_id: Dict[int, District] = {}
+        self.by_key: Dict[str, District] = {}
+        self.by_name: Dict[str, List[District]] = {}
+        self.by_kabupaten: Dict[str, List[District]] = {}
+        for district in districts or []:
+            self.add(district)
+
+    @classmethod
+    def from_csv(cls, file_path: str = None, province: str = 'East Java',
+                 country: str = 'Indonesia') -> 'DistrictRegistry':
+        """Memuat registry dari CSV dengan kolom id, kecamatan, kabupaten, lat, lon"""
+        path = Path(file_path or FILE_CONFIG['districts_file'])
+        if not path.is_absolute() and not path.exists():
+            path = PROJECT_ROOT / path
+
+        province = sys.intern(province)
+        country = sys.intern(country)
+        registry = cls()
+        with open(path, newline='', encoding=FILE_CONFIG['encoding']) as f:
+            for row in csv.DictReader(f):
+                registry.add(District(
+                    int(row['id']),
+                    sys.intern(row['kecamatan'].strip()),
+                    sys.intern(row['kabupaten'].strip()),
+                    province,
+                    country,
+                    float(row['lat']) if row.get('lat') else None,
+                    float(row['lon']) if row.get('lon') else None
+                ))
+        return registry
+
+    def add(self, district: District):
+        """Menambahkan kecamatan ke semua index; id dan key tampilan harus unik, nama boleh sama"""
+        if district.id in self.by_id:
+            raise ValueError(f"Id kecamatan duplikat: {district.id} ({district.key})")
+        if district.key in self.by_key:
+            raise ValueError(f"Kecamatan duplikat di kabupaten yang sama: {district.key}")
+        self.by_id[district.id] = district
+        self.by_key[district.key] = district
+        self.by_name.setdefault(district.name, []).append(district)
+        self.by_kabupaten.setdefault(district.kabupaten, []).append(district)
+
+    def get(self, key: str) -> Optional[District]:
+        return self.by_key.get(key)
+
+    def get_by_name(self, name: str) -> List[District]:
+        return self.by_name.get(name, [])
+
+    def get_by_id(self, district_id: int) -> Optional[District]:
+        return self.by_id.get(district_id)
+
+    def get_by_kabupaten(self, kabupaten: str) -> List[District]:
+        return self.by_kabupaten.get(kabupaten, [])
+
+    def keys(self) -> List[str]:
+        return list(self.by_key)
+
+    def __iter__(self) -> Iterator[District]:
+        return iter(self.by_id.values())
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.by_key
@@ -0,0 +1,188 @@
+# services/export_service.py
+"""Export data cuaca ke CSV (opsional gzip/zstd), Parquet dan Feather/Arrow IPC secara streaming dan atomik"""
+
+import itertools
+import os
+import shutil
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+from config.config import FILE_CONFIG
+from services.snapshot_store import atomic_open
+from utils.helpers import is_module_available
+
+# format -> ekstensi file
+EXPORT_FORMATS = {
+    'csv': '.csv',
+    'csv.gz': '.csv.gz',
+    'csv.zst': '.csv.zst',
+    'parquet': '.parquet',
+    'feather': '.feather'
+}
+CSV_COMPRESSION = {'csv': None, 'csv.gz': 'gzip', 'csv.zst': 'zstd'}
+EXPORT_MODES = ('overwrite', 'append')
+INDEX_LABEL = 'district'
+
+
+class ExportService:
+    """Menulis DataFrame per chunk ke file sementara lalu os.replace, tanpa salinan reset_index()"""
+
+    _part_ids = itertools.count()
+
+    def __init__(self, output_dir: str = None, chunk_rows: int = None, compression: str = None):
+        self.output_dir = output_dir or FILE_CONFIG['data_dir']
+        self.chunk_rows = chunk_rows or FILE_CONFIG['export_chunk_rows']
+        self.compression = compression if compression is not None else FILE_CONFIG['export_compression']
+
+    def export(self, weather_df: pd.DataFrame, fmt: str = 'csv', filename: str = None,
+               columns: Sequence[str] = None, mode: str = 'overwrite',
+               partition_by: Sequence[str] = None) -> str:
+        """Export dan kembalikan path file (atau folder dataset untuk partisi / append Parquet-Feather)
+
+        mode='append' menambah baris ke CSV yang sudah ada; Parquet/Feather tidak bisa di-append
+        di tempat sehingga ditulis sebagai file part baru di folder dataset. partition_by menulis
+        folder bergaya Hive (kolom=nilai/part-*.ext).
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format export tidak didukung: {fmt} (pilihan: {', '.join(EXPORT_FORMATS)})")
+        if mode not in EXPORT_MODES:
+            raise ValueError(f"Mode export tidak didukung: {mode}")
+        self._check_dependencies(fmt)
+
+        partition_by = list(partition_by or [])
+        frame = self._select_columns(weather_df, columns, partition_by)
+        target = os.path.join(self.output_dir, self._resolve_filename(fmt, filename, mode, partition_by))
+
+        if partition_by:
+            self._write_partitioned(frame, target, fmt, mode, partition_by)
+        elif mode == 'append' and not fmt.startswith('csv'):
+            os.makedirs(target, exist_ok=True)
+            self._write_file(frame, self._part_path(target, fmt), fmt)
+        else:
+            self._write_file(frame, target, fmt, append=(mode == 'append'))
+        return target
+
+    @staticmethod
+    def _check_dependencies(fmt: str):
+        if fmt in ('parquet', 'feather') and not is_module_available('pyarrow'):
+            raise ImportError(f"pyarrow diperlukan untuk export {fmt} (pip install pyarrow)")
+        if fmt == 'csv.zst' and not is_module_available('zstandard'):
+            raise ImportError("zstandard diperlukan untuk export csv.zst (pip install zstandard)")
+
+    @staticmethod
+    def _select_columns(weather_df: pd.DataFrame, columns: Optional[Sequence[str]],
+                        partition_by: List[str]) -> pd.DataFrame:
+        """Memilih kolom (kolom partisi selalu ikut); tanpa Copy-on-Write tidak ada data yang disalin"""
+        if columns is None:
+            selected = list(weather_df.columns)
+        else:
+            selected = list(columns) + [col for col in partition_by if col not in columns]
+        unknown = [col for col in selected if col not in weather_df.columns]
+        if unknown:
+            raise ValueError(f"Kolom tidak ditemukan: {', '.join(unknown)}")
+        return weather_df if selected == list(weather_df.columns) else weather_df[selected]
+
+    @staticmethod
+    def _resolve_filename(fmt: str, filename: Optional[str], mode: str, partition_by: List[str]) -> str:
+        extension = EXPORT_FORMATS[fmt]
+        is_dataset = bool(partition_by) or (mode == 'append' and not fmt.startswith('csv'))
+        if filename is None:
+            # Append/partisi menulis ke target tetap agar run berikutnya menambah data yang sama
+            if is_dataset:
+                filename = f"{FILE_CONFIG['csv_prefix']}_{fmt.replace('.', '_')}"
+                if partition_by:
+                    filename += f"_by_{'_'.join(partition_by)}"
+            elif mode == 'append':
+                filename = FILE_CONFIG['csv_prefix']
+            else:
+                filename = f"{FILE_CONFIG['csv_prefix']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        elif filename.endswith(extension):
+            filename = filename[:-len(extension)]
+        return filename if is_dataset else f"{filename}{extension}"
+
+    def _part_path(self, folder: str, fmt: str) -> str:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join(folder, f"part-{timestamp}-{os.getpid()}-{next(self._part_ids)}{EXPORT_FORMATS[fmt]}")
+
+    def _write_partitioned(self, frame: pd.DataFrame, target: str, fmt: str, mode: str,
+                           partition_by: List[str]):
+        """Satu file part per kombinasi nilai partisi; overwrite hanya mengganti partisi yang ditulis"""
+        data = frame.drop(columns=partition_by)
+        keys = [frame[col] for col in partition_by]
+        for values, group in data.groupby(keys, observed=True, sort=True):
+            values = values if isinstance(values, tuple) else (values,)
+            folder = os.path.join(target, *(
+                f"{col}={str(value).replace(os.sep, '_')}" for col, value in zip(partition_by, values)
+            ))
+            os.makedirs(folder, exist_ok=True)
+            part_path = self._part_path(folder, fmt)
+            self._write_file(group, part_path, fmt)
+            if mode == 'overwrite':
+                for name in os.listdir(folder):
+                    path = os.path.join(folder, name)
+                    if name.startswith('part-') and path != part_path:
+                        os.remove(path)
+
+    def _chunks(self, frame: pd.DataFrame) -> Iterator[pd.DataFrame]:
+        for start in range(0, max(len(frame), 1), self.chunk_rows):
+            yield frame.iloc[start:start + self.chunk_rows]
+
+    def _write_file(self, frame: pd.DataFrame, path: str, fmt: str, append: bool = False):
+        if fmt.startswith('csv'):
+            self._write_csv(frame, path, CSV_COMPRESSION[fmt], append)
+        elif fmt == 'parquet':
+            self._write_parquet(frame, path)
+        else:
+            self._write_feather(frame, path)
+
+    def _write_csv(self, frame: pd.DataFrame, path: str, compression: Optional[str], append: bool):
+        """CSV per chunk; member gzip/frame zstd yang disambung tetap satu file yang valid"""
+        existing = append and os.path.exists(path)
+        with atomic_open(path) as f:
+            if existing:
+                with open(path, 'rb') as current:
+                    shutil.copyfileobj(current, f)
+            for i, chunk in enumerate(self._chunks(frame)):
+                chunk.to_csv(f, header=(i == 0 and not existing), index=True, index_label=INDEX_LABEL,
+                             encoding=FILE_CONFIG['encoding'], compression=compression)
+
+    def _arrow_batches(self, frame: pd.DataFrame):
+        """Tabel Arrow per chunk dengan skema yang sama (skema diambil dari chunk pertama)"""
+        import pyarrow as pa
+
+        schema = None
+        for chunk in self._chunks(frame):
+            table = pa.Table.from_pandas(chunk.rename_axis(INDEX_LABEL), schema=schema, preserve_index=True)
+            schema = table.schema
+            yield table
+
+    def _write_parquet(self, frame: pd.DataFrame, path: str):
+        import pyarrow.parquet as pq
+
+        with atomic_open(path) as f:
+            writer = None
+            try:
+                for table in self._arrow_batches(frame):
+                    if writer is None:
+                        writer = pq.ParquetWriter(f, table.schema, compression=self.compression or 'none')
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+    def _write_feather(self, frame: pd.DataFrame, path: str):
+        import pyarrow as pa
+
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with atomic_open(path) as f:
+            writer = None
+            try:
+                for table in self._arrow_batches(frame):
+                    if writer is None:
+                        writer = pa.ipc.new_file(f, table.schema, options=options)
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
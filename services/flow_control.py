@@ -0,0 +1,115 @@
+# services/flow_control.py
+"""Rate limiter token-bucket dan pengendali konkurensi adaptif (AIMD) untuk request API"""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict
+
+
+class TokenBucket:
+    """Rate limiter token-bucket thread-safe; rate_per_minute <= 0 berarti tanpa batas"""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Mengambil satu token dan mengembalikan berapa detik pemanggil harus menunggu"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Menunggu (blocking) sampai token tersedia; mengembalikan lama menunggu (detik)"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def async_acquire(self) -> float:
+        """Menunggu token tanpa memblokir event loop; mengembalikan lama menunggu (detik)"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class AdaptiveConcurrency:
+    """Batas konkurensi AIMD: naik +1 per putaran saat sehat, turun multiplikatif saat 429/timeout"""
+
+    def __init__(self, initial: int, min_limit: int = 1, max_limit: int = 32,
+                 latency_target: float = 1.0, decrease_factor: float = 0.5):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.limit = float(min(max(initial, min_limit), self.max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self._in_flight < int(self.limit):
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Slot konkurensi untuk kode sinkron (thread)"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def async_slot(self, poll_interval: float = 0.005):
+        """Slot konkurensi untuk coroutine; polling agar event loop tidak terblokir"""
+        while not self.try_acquire():
+            await asyncio.sleep(poll_interval)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(self, latency: float, overloaded: bool = False):
+        """Mencatat hasil satu request untuk menyesuaikan batas konkurensi"""
+        with self._cond:
+            if overloaded:
+                # Turunkan maksimal sekali per latency_target agar satu burst 429 tidak menjatuhkan ke minimum
+                now = time.monotonic()
+                if now - self._last_decrease >= self.latency_target:
+                    self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            elif latency <= self.latency_target:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {'limit': int(self.limit), 'in_flight': self._in_flight}
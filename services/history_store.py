@@ -0,0 +1,99 @@
+# services/history_store.py
+"""Penyimpanan histori cuaca append-only berbasis partisi Parquet harian"""
+
+import io
+import os
+from datetime import date, datetime
+from typing import List, Optional
+
+import pandas as pd
+
+from config.config import FILE_CONFIG
+from services.snapshot_store import atomic_write_bytes
+from utils.helpers import is_module_available
+
+# pyarrow opsional (engine Parquet untuk pandas), histori dinonaktifkan tanpa pyarrow
+PYARROW_AVAILABLE = is_module_available('pyarrow')
+
+
+class HistoryStore:
+    """Menyimpan setiap hasil refresh ke partisi date=YYYY-MM-DD dan membaca ulang per rentang"""
+
+    PARTITION_PREFIX = 'date='
+
+    def __init__(self, root_dir: str = None):
+        self.root_dir = root_dir or FILE_CONFIG['history_dir']
+
+    @property
+    def available(self) -> bool:
+        return PYARROW_AVAILABLE
+
+    def _partition_dir(self, day: date) -> str:
+        return os.path.join(self.root_dir, f"{self.PARTITION_PREFIX}{day.isoformat()}")
+
+    def append(self, weather_df: pd.DataFrame, fetched_at: datetime) -> Optional[str]:
+        """Menambahkan satu snapshot sebagai file Parquet baru di partisi harinya"""
+        if not self.available or weather_df.empty:
+            return None
+
+        records = weather_df.reset_index()
+        records.insert(0, 'fetched_at', pd.Timestamp(fetched_at))
+
+        buffer = io.BytesIO()
+        records.to_parquet(buffer, index=False, compression='zstd')
+
+        filename = f"part-{fetched_at:%Y%m%d_%H%M%S_%f}.parquet"
+        file_path = os.path.join(self._partition_dir(fetched_at.date()), filename)
+        atomic_write_bytes(file_path, buffer.getvalue())
+        return file_path
+
+    def _partition_files(self, start: Optional[datetime], end: Optional[datetime]) -> List[str]:
+        """Daftar file Parquet hanya dari partisi yang beririsan dengan rentang waktu"""
+        if not os.path.isdir(self.root_dir):
+            return []
+
+        files = []
+        for entry in sorted(os.listdir(self.root_dir)):
+            if not entry.startswith(self.PARTITION_PREFIX):
+                continue
+            try:
+                day = date.fromisoformat(entry[len(self.PARTITION_PREFIX):])
+            except ValueError:
+                continue
+            if (start and day < start.date()) or (end and day > end.date()):
+                continue
+            partition = os.path.join(self.root_dir, entry)
+            files.extend(
+                os.path.join(partition, name)
+                for name in sorted(os.listdir(partition))
+                if name.endswith('.parquet')
+            )
+        return files
+
+    def query(self, districts: List[str] = None, start: datetime = None,
+              end: datetime = None, columns: List[str] = None) -> pd.DataFrame:
+        """Membaca histori untuk kecamatan x rentang waktu x kolom tertentu saja"""
+        if not self.available:
+            raise ImportError("pyarrow diperlukan untuk histori cuaca (pip install pyarrow)")
+
+        read_columns = None
+        if columns is not None:
+            read_columns = ['fetched_at', 'district'] + [c for c in columns if c not in ('fetched_at', 'district')]
+
+        filters = []
+        if districts:
+            filters.append(('district', 'in', list(districts)))
+        if start:
+            filters.append(('fetched_at', '>=', pd.Timestamp(start)))
+        if end:
+            filters.append(('fetched_at', '<=', pd.Timestamp(end)))
+
+        frames = [
+            pd.read_parquet(file_path, columns=read_columns, filters=filters or None)
+            for file_path in self._partition_files(start, end)
+        ]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=read_columns or [])
+
+        return pd.concat(frames, ignore_index=True).set_index(['fetched_at', 'district'])
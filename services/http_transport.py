@@ -0,0 +1,146 @@
+# services/http_transport.py
+"""HTTP transport dengan connection pooling, keep-alive dan retry/backoff"""
+
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.config import API_CONFIG
+from services.flow_control import AdaptiveConcurrency, TokenBucket
+from services.metrics import (API_RATE_LIMIT_WAIT, API_REQUEST_SECONDS, API_RESPONSE_BYTES,
+                              API_RESPONSES, API_RETRIES)
+
+
+class HTTPTransport:
+    """Transport HTTP thread-safe berbasis pool session yang dipakai ulang (keep-alive)"""
+
+    def __init__(self, pool_size: int = None, timeout: float = None,
+                 max_retries: int = None, backoff_factor: float = None,
+                 backoff_max: float = None, retry_statuses=None):
+        self.pool_size = pool_size or API_CONFIG['max_workers']
+        self.timeout = timeout if timeout is not None else API_CONFIG['timeout']
+        self.max_retries = max_retries if max_retries is not None else API_CONFIG['max_retries']
+        self.backoff_factor = backoff_factor if backoff_factor is not None else API_CONFIG['backoff_factor']
+        self.backoff_max = backoff_max if backoff_max is not None else API_CONFIG['backoff_max']
+        self.retry_statuses = frozenset(retry_statuses or API_CONFIG['retry_statuses'])
+
+        # Dibagi oleh semua jalur fetch (threaded, bulk, async)
+        self.rate_limiter = TokenBucket(API_CONFIG['rate_limit_per_minute'], API_CONFIG['rate_limit_burst'])
+        self.concurrency = AdaptiveConcurrency(
+            API_CONFIG['max_workers'],
+            API_CONFIG['concurrency_min'],
+            API_CONFIG['concurrency_max'],
+            API_CONFIG['latency_target']
+        )
+
+        # LIFO agar session dengan koneksi yang masih hangat dipakai lebih dulu
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Membuat session baru; satu session dipakai oleh satu thread dalam satu waktu"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @contextmanager
+    def _checkout(self):
+        """Meminjam session dari pool, membuat baru bila pool belum penuh"""
+        try:
+            session = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.pool_size
+                if can_create:
+                    self._created += 1
+            session = self._create_session() if can_create else self._idle.get()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Menghitung jeda retry: Retry-After bila ada, selain itu full-jitter exponential"""
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Request HTTP dengan retry pada 429/5xx dan error koneksi"""
+        attempt = 0
+        while True:
+            API_RATE_LIMIT_WAIT.inc(self.rate_limiter.acquire())
+            try:
+                with self.concurrency.slot(), self._checkout() as session:
+                    start = time.perf_counter()
+                    try:
+                        response = session.request(method, url, timeout=self.timeout, **kwargs)
+                    except requests.Timeout:
+                        self._record(method, time.perf_counter() - start, 'timeout', overloaded=True)
+                        raise
+                    except requests.ConnectionError:
+                        self._record(method, time.perf_counter() - start, 'connection_error')
+                        raise
+                    self._record(method, time.perf_counter() - start, response.status_code,
+                                 overloaded=response.status_code == 429)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                API_RETRIES.inc(reason='timeout' if isinstance(e, requests.Timeout) else 'connection_error')
+                time.sleep(self.backoff_delay(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in self.retry_statuses and attempt < self.max_retries:
+                API_RETRIES.inc(reason=str(response.status_code))
+                delay = self.backoff_delay(attempt, response.headers.get('Retry-After'))
+                response.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            response.raise_for_status()
+            API_RESPONSE_BYTES.inc(len(response.content), method=method)
+            return response
+
+    def _record(self, method: str, latency: float, status, overloaded: bool = False):
+        """Mencatat latensi ke pengendali konkurensi dan metrik"""
+        if status != 'connection_error':
+            self.concurrency.record(latency, overloaded=overloaded)
+        API_REQUEST_SECONDS.observe(latency, method=method, client='requests')
+        API_RESPONSES.inc(method=method, status=status)
+
+    def get(self, url: str, params: Dict = None) -> requests.Response:
+        """GET dengan retry"""
+        return self.request('GET', url, params=params)
+
+    def post(self, url: str, params: Dict = None, json: Dict = None) -> requests.Response:
+        """POST dengan retry"""
+        return self.request('POST', url, params=params, json=json)
+
+    def ensure_pool_size(self, pool_size: int):
+        """Memperbesar pool agar sesuai dengan jumlah worker executor"""
+        with self._lock:
+            if pool_size > self.pool_size:
+                self.pool_size = pool_size
+
+    def close(self):
+        """Menutup semua session yang sedang idle di pool"""
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+                self._created -= 1
@@ -0,0 +1,31 @@
+# services/json_codec.py
+"""Decoder JSON response API: orjson bila terpasang, json standar sebagai fallback"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+from utils.helpers import is_module_available
+
+ORJSON_AVAILABLE = is_module_available('orjson')
+
+_loads: Optional[Callable[[Union[bytes, str]], Any]] = None
+
+
+def _resolve_loads() -> Callable[[Union[bytes, str]], Any]:
+    """Memilih decoder saat pertama dipakai agar orjson tidak di-import saat startup"""
+    global _loads
+    if ORJSON_AVAILABLE:
+        import orjson
+        _loads = orjson.loads
+    else:
+        _loads = json.loads
+    return _loads
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode body response (bytes langsung, tanpa decode teks terpisah); ValueError bila tidak valid"""
+    return (_loads or _resolve_loads())(data)
+
+
+def decoder_name() -> str:
+    return 'orjson' if ORJSON_AVAILABLE else 'json'
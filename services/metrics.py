@@ -0,0 +1,354 @@
+# services/metrics.py
+"""Registry metrik (counter, gauge, histogram) dengan eksposisi format teks Prometheus"""
+
+import bisect
+import math
+from abc import ABC, abstractmethod
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from services.snapshot_store import atomic_write_bytes
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + '}'
+
+
+class _Metric(ABC):
+    """Dasar metrik berlabel; nilai disimpan per tuple label di self._values milik subclass"""
+
+    TYPE = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Label {self.name} harus {self.labelnames}, bukan {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Baris sampel format teks Prometheus (tanpa HELP/TYPE)"""
+
+    @abstractmethod
+    def export_state(self) -> Optional[List]:
+        """Nilai mentah per label untuk digabung ke registry proses lain (None bila tidak bisa dijumlahkan)"""
+
+    @abstractmethod
+    def merge_state(self, state: List):
+        """Menggabungkan hasil export_state registry lain ke metrik ini"""
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.TYPE}\n"
+        return header + ''.join(f"{line}\n" for line in self.samples())
+
+
+class Counter(_Metric):
+    """Nilai yang hanya bertambah"""
+
+    TYPE = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counter tidak boleh berkurang")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def export_state(self) -> List:
+        with self._lock:
+            return list(self._values.items())
+
+    def merge_state(self, state: List):
+        """Menjumlahkan nilai dari export_state registry lain"""
+        with self._lock:
+            for key, value in state:
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0.0) + value
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Nilai yang bisa naik turun; bisa juga dibaca dari fungsi saat eksposisi"""
+
+    TYPE = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """Nilai diambil dari function setiap kali metrik dirender"""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        with self._lock:
+            function = self._functions.get(key)
+            value = self._values.get(key, 0.0)
+        return float(function()) if function else value
+
+    def export_state(self) -> None:
+        """Gauge menyimpan nilai sesaat milik prosesnya (sebagian dibaca dari fungsi), jadi tidak dikirim"""
+        return None
+
+    def merge_state(self, state: List):
+        """Nilai dari registry lain menimpa nilai yang ada (gauge tidak dijumlahkan)"""
+        with self._lock:
+            for key, value in state:
+                self._values[tuple(key)] = float(value)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            values[key] = float(function())
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Distribusi nilai dalam bucket kumulatif beserta sum dan count"""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label: [jumlah per bucket (non-kumulatif) + overflow, sum]
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Mengukur durasi blok dan mencatatnya ke histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[0]) if state else 0
+
+    def export_state(self) -> List:
+        with self._lock:
+            return [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+
+    def merge_state(self, state: List):
+        """Menjumlahkan bucket dan sum dari export_state registry lain (bucket harus sama)"""
+        with self._lock:
+            for key, (counts, total) in state:
+                key = tuple(key)
+                current = self._values.get(key)
+                if current is None:
+                    current = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+                current[0] = [a + b for a, b in zip(current[0], counts)]
+                current[1] += total
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Kumpulan metrik bernama; metrik dengan nama sama dipakai ulang"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metrik {name} sudah terdaftar dengan tipe/label berbeda")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def export_state(self) -> Dict[str, List]:
+        """Nilai counter dan histogram (gauge tidak ikut) untuk dikirim dari proses worker"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: state for metric in metrics if (state := metric.export_state())}
+
+    def merge_state(self, state: Dict[str, List]):
+        """Menambahkan hasil export_state proses lain ke metrik dengan nama yang sama"""
+        for name, metric_state in state.items():
+            metric = self.get(name)
+            if metric is not None:
+                metric.merge_state(metric_state)
+
+    def clear(self):
+        """Mengosongkan nilai semua metrik (gauge berbasis fungsi tetap terdaftar)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    def render(self) -> str:
+        """Semua metrik dalam format teks eksposisi Prometheus 0.0.4"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return ''.join(metric.render() for metric in metrics)
+
+    def write_textfile(self, file_path: str):
+        """Menulis eksposisi ke file secara atomik (untuk textfile collector node_exporter)"""
+        atomic_write_bytes(file_path, self.render().encode('utf-8'))
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Endpoint GET /metrics"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1',
+                         registry: 'MetricsRegistry' = None) -> ThreadingHTTPServer:
+    """Menjalankan endpoint /metrics di daemon thread"""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    server.registry = registry or REGISTRY
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
+
+
+# Registry default aplikasi
+REGISTRY = MetricsRegistry()
+
+# Metrik jalur fetch
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    'weather_api_request_duration_seconds', 'Latensi satu request HTTP ke WeatherAPI', ['method', 'client'])
+API_RESPONSES = REGISTRY.counter(
+    'weather_api_responses_total', 'Response WeatherAPI per status (atau timeout/connection_error)',
+    ['method', 'status'])
+API_RETRIES = REGISTRY.counter('weather_api_retries_total', 'Request WeatherAPI yang diulang', ['reason'])
+API_RESPONSE_BYTES = REGISTRY.counter(
+    'weather_api_response_bytes_total', 'Byte body response WeatherAPI yang diterima', ['method'])
+API_RATE_LIMIT_WAIT = REGISTRY.counter(
+    'weather_api_rate_limit_wait_seconds_total', 'Total waktu menunggu token rate limiter')
+API_CONCURRENCY_LIMIT = REGISTRY.gauge('weather_api_concurrency_limit', 'Batas konkurensi adaptif saat ini')
+PARSE_SECONDS = REGISTRY.histogram(
+    'weather_parse_duration_seconds', 'Waktu decode JSON dan parse response menjadi record', ['kind'],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1))
+CACHE_LOOKUPS = REGISTRY.counter('weather_cache_lookups_total', 'Lookup cache response API', ['result'])
+CACHE_ENTRIES = REGISTRY.gauge('weather_cache_entries', 'Jumlah entry cache response API')
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    'weather_single_flight_calls_total',
+    'Pemanggilan single-flight: dijalankan sendiri (executed) atau berbagi hasil yang sedang berjalan (shared)',
+    ['scope', 'result'])
+
+# Metrik model
+FRAME_BUILD_SECONDS = REGISTRY.histogram(
+    'weather_frame_build_duration_seconds', 'Waktu membangun DataFrame dari record',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+REFRESH_SECONDS = REGISTRY.histogram(
+    'weather_refresh_duration_seconds', 'Durasi refresh end-to-end', ['engine'],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0))
+REFRESH_DISTRICTS = REGISTRY.counter(
+    'weather_refresh_districts_total', 'Kecamatan yang di-refresh per hasil', ['result'])
+PERSIST_SECONDS = REGISTRY.histogram(
+    'weather_persist_duration_seconds', 'Waktu menyimpan snapshot/histori', ['target'])
+SNAPSHOT_ROWS = REGISTRY.gauge('weather_snapshot_rows', 'Jumlah kecamatan di snapshot aktif')
+LAST_REFRESH = REGISTRY.gauge(
+    'weather_last_refresh_timestamp_seconds', 'Waktu (epoch) snapshot terakhir dipublikasikan')
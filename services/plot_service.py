@@ -1,32 +1,37 @@
 # services/plot_service.py
+import hashlib
+import itertools
+import multiprocessing
+import os # Tambahkan import os untuk membuat folder
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Mapping, Optional
+
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib
 import seaborn as sns
-from datetime import datetime
-import os # Tambahkan import os untuk membuat folder
+from cycler import cycler
+from matplotlib.figure import Figure
 
-# Set matplotlib to use non-interactive backend
-plt.switch_backend('Agg')
+from config.config import FILE_CONFIG, PLOT_CONFIG
+from models.statistics_engine import StatisticsEngine
+from services.render_cache import RenderCache
 
-class PlotService:
-    """Service untuk membuat grafik dan visualisasi cuaca"""
-    
-    def __init__(self):
-        # Set style untuk matplotlib
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
-    
-    def create_weather_plots(self, weather_df: pd.DataFrame) -> str:
-        """Membuat grafik cuaca dan mengembalikan nama file"""
-        try:
-            # Jika DataFrame kosong, jangan lakukan apa-apa
-            if weather_df.empty:
-                raise ValueError("DataFrame cuaca kosong, tidak bisa membuat grafik.")
 
+def render_weather_figure(weather_df: pd.DataFrame, file_path: str, title: str,
+                          preview: bool, settings: Dict):
+    """Merender enam panel grafik ke file_path memakai API Figure (tanpa state global pyplot).
+
+    Fungsi level-modul agar bisa dijalankan di worker proses.
+    """
+    rc = dict(matplotlib.style.library.get(settings['style'], {}))
+    rc['axes.prop_cycle'] = cycler(color=settings['palette_colors'])
+    try:
+        with matplotlib.rc_context(rc):
             # Create figure dengan subplots
-            fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-            fig.suptitle('Analisis Cuaca Jawa Timur', fontsize=16, fontweight='bold')
-            
+            fig = Figure(figsize=settings['figure_size'])
+            axes = fig.subplots(2, 3)
+            fig.suptitle(title, fontsize=16, fontweight='bold')
+
             # 1. Histogram Suhu
             temp_data = weather_df['temperature'].dropna()
             axes[0,0].hist(temp_data, bins=10, alpha=0.7, color='orange', edgecolor='black')
@@ -34,7 +39,7 @@ class PlotService:
             axes[0,0].set_xlabel('Suhu (°C)')
             axes[0,0].set_ylabel('Jumlah Kecamatan')
             axes[0,0].grid(True, alpha=0.3)
-            
+
             # 2. Bar chart kondisi cuaca
             condition_counts = weather_df['condition'].value_counts().head(8)
             axes[0,1].bar(range(len(condition_counts)), condition_counts.values, color='skyblue', edgecolor='black')
@@ -44,16 +49,16 @@ class PlotService:
             axes[0,1].set_xticks(range(len(condition_counts)))
             axes[0,1].set_xticklabels(condition_counts.index, rotation=45, ha='right')
             axes[0,1].grid(True, alpha=0.3)
-            
+
             # 3. Scatter plot Suhu vs Kelembaban
             scatter_data = weather_df[['temperature', 'humidity']].dropna()
-            axes[0,2].scatter(scatter_data['temperature'], scatter_data['humidity'], 
+            axes[0,2].scatter(scatter_data['temperature'], scatter_data['humidity'],
                               alpha=0.7, color='red', s=60, edgecolors='black')
             axes[0,2].set_title('Suhu vs Kelembaban')
             axes[0,2].set_xlabel('Suhu (°C)')
             axes[0,2].set_ylabel('Kelembaban (%)')
             axes[0,2].grid(True, alpha=0.3)
-            
+
             # 4. Box plot kecepatan angin
             wind_data = weather_df['wind_speed'].dropna()
             axes[1,0].boxplot(wind_data, patch_artist=True,
@@ -61,10 +66,10 @@ class PlotService:
             axes[1,0].set_title('Distribusi Kecepatan Angin')
             axes[1,0].set_ylabel('Kecepatan Angin (km/h)')
             axes[1,0].grid(True, alpha=0.3)
-            
+
             # 5. Bar chart tekanan udara per kecamatan (top 10)
             top_pressure = weather_df.nlargest(10, 'pressure')
-            axes[1,1].barh(range(len(top_pressure)), top_pressure['pressure'], 
+            axes[1,1].barh(range(len(top_pressure)), top_pressure['pressure'],
                            color='purple', alpha=0.7, edgecolor='black')
             axes[1,1].set_title('Top 10 Tekanan Udara Tertinggi')
             axes[1,1].set_xlabel('Tekanan (mb)')
@@ -72,50 +77,174 @@ class PlotService:
             axes[1,1].set_yticks(range(len(top_pressure)))
             axes[1,1].set_yticklabels(top_pressure.index)
             axes[1,1].grid(True, alpha=0.3)
-            
+
             # 6. Pie chart indeks UV
             uv_data = weather_df['uv_index'].dropna()
             if not uv_data.empty:
-                uv_ranges = pd.cut(uv_data, bins=[0, 3, 6, 8, 11, float('inf')], 
-                                     labels=['Rendah (0-3)', 'Sedang (3-6)', 'Tinggi (6-8)', 
+                uv_ranges = pd.cut(uv_data, bins=[0, 3, 6, 8, 11, float('inf')],
+                                     labels=['Rendah (0-3)', 'Sedang (3-6)', 'Tinggi (6-8)',
                                              'Sangat Tinggi (8-11)', 'Ekstrem (>11)'], right=False)
                 uv_counts = uv_ranges.value_counts()
-                
+
                 colors = ['green', 'yellow', 'orange', 'red', 'purple']
                 axes[1,2].pie(uv_counts.values, labels=uv_counts.index, autopct='%1.1f%%',
                               colors=colors[:len(uv_counts)], startangle=90)
             axes[1,2].set_title('Distribusi Indeks UV')
-            
+
             # Adjust layout
-            plt.tight_layout()
-            
-            # Save plot ke folder 'data'
-            folder_name = "data"
-            os.makedirs(folder_name, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"grafik_cuaca_jatim_{timestamp}.png"
-            file_path = os.path.join(folder_name, filename)
-            
-            plt.savefig(file_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return file_path
-            
-        except Exception as e:
-            # Pastikan plot ditutup jika terjadi error
-            plt.close()
-            raise Exception(f"Error membuat grafik: {e}")
-    
+            fig.tight_layout()
+
+            # Preview: dpi rendah tanpa bbox 'tight' (yang memaksa render dua kali)
+            if preview:
+                fig.savefig(file_path, format='png', dpi=settings['preview_dpi'])
+            else:
+                fig.savefig(file_path, format='png', dpi=settings['dpi'], bbox_inches='tight')
+
+    except Exception as e:
+        raise Exception(f"Error membuat grafik: {e}")
+
+
+class RenderJob:
+    """Handle untuk render yang berjalan di background"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, futures: List[Future], description: str):
+        self.id = next(self._ids)
+        self.futures = futures
+        self.description = description
+
+    def done(self) -> bool:
+        return all(future.done() for future in self.futures)
+
+    def result(self, timeout: float = None) -> List[str]:
+        """Daftar file hasil render (menunggu bila belum selesai)"""
+        return [future.result(timeout) for future in self.futures]
+
+
+class PlotService:
+    """Service untuk membuat grafik dan visualisasi cuaca"""
+
+    # Naikkan bila kode rendering berubah agar cache lama tidak dipakai
+    RENDER_VERSION = 2
+    PLOTTED_COLUMNS = ['temperature', 'condition', 'humidity', 'wind_speed', 'pressure', 'uv_index']
+    DEFAULT_TITLE = 'Analisis Cuaca Jawa Timur'
+
+    def __init__(self):
+        # Style dan palette diteruskan ke setiap render, bukan di-set global
+        self.settings = {
+            'style': PLOT_CONFIG['style'],
+            'palette_colors': sns.color_palette(PLOT_CONFIG['palette']).as_hex(),
+            'figure_size': PLOT_CONFIG['figure_size'],
+            'dpi': PLOT_CONFIG['dpi'],
+            'preview_dpi': PLOT_CONFIG['preview_dpi']
+        }
+        self.render_cache = RenderCache(
+            os.path.join(FILE_CONFIG['data_dir'], PLOT_CONFIG['cache_dir']),
+            FILE_CONFIG['plot_prefix'],
+            PLOT_CONFIG['cache_max_bytes'],
+            PLOT_CONFIG['cache_max_entries']
+        )
+        self._executor: Optional[Executor] = None
+
+    def render_key(self, weather_df: pd.DataFrame, preview: bool = False, title: str = DEFAULT_TITLE) -> str:
+        """Hash konten kolom yang diplot plus konfigurasi plot"""
+        digest = hashlib.sha256()
+        digest.update(pd.util.hash_pandas_object(weather_df[self.PLOTTED_COLUMNS], index=True).to_numpy().tobytes())
+        config = (self.RENDER_VERSION, preview, title, PLOT_CONFIG['style'], PLOT_CONFIG['palette'],
+                  tuple(PLOT_CONFIG['figure_size']),
+                  PLOT_CONFIG['preview_dpi'] if preview else PLOT_CONFIG['dpi'])
+        digest.update(repr(config).encode('utf-8'))
+        return digest.hexdigest()[:20]
+
+    def create_weather_plots(self, weather_df: pd.DataFrame, preview: bool = False) -> str:
+        """Membuat grafik cuaca dan mengembalikan nama file (dipakai ulang bila data tidak berubah)"""
+        # Jika DataFrame kosong, jangan lakukan apa-apa
+        if weather_df.empty:
+            raise Exception("Error membuat grafik: DataFrame cuaca kosong, tidak bisa membuat grafik.")
+
+        key = self.render_key(weather_df, preview)
+        cached_path = self.render_cache.get(key)
+        if cached_path:
+            return cached_path
+
+        return self.render_cache.put(
+            key, lambda path: render_weather_figure(weather_df, path, self.DEFAULT_TITLE, preview, self.settings)
+        )
+
+    def _get_executor(self) -> Executor:
+        """Pool worker render, dibuat saat pertama kali dibutuhkan"""
+        if self._executor is None:
+            workers = PLOT_CONFIG['render_workers'] or os.cpu_count() or 1
+            if PLOT_CONFIG['render_executor'] == 'process':
+                # spawn: thread scheduler, server metrics dan transport HTTP sudah berjalan; fork bisa
+                # mewarisi lock yang sedang dipegang thread tersebut dan membuat worker deadlock
+                self._executor = ProcessPoolExecutor(max_workers=workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='render')
+        return self._executor
+
+    def _submit_render(self, weather_df: pd.DataFrame, preview: bool, title: str) -> Future:
+        """Menjadwalkan satu render; hasil cache langsung dikembalikan sebagai future selesai"""
+        key = self.render_key(weather_df, preview, title)
+        result: Future = Future()
+        cached_path = self.render_cache.get(key)
+        if cached_path:
+            result.set_result(cached_path)
+            return result
+
+        os.makedirs(self.render_cache.cache_dir, exist_ok=True)
+        tmp_path = self.render_cache.tmp_path_for(key)
+        worker = self._get_executor().submit(render_weather_figure, weather_df, tmp_path, title, preview, self.settings)
+
+        def on_done(future: Future):
+            try:
+                future.result()
+                result.set_result(self.render_cache.commit(key, tmp_path))
+            except Exception as e:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                result.set_exception(e)
+
+        worker.add_done_callback(on_done)
+        return result
+
+    def submit_weather_plots(self, weather_df: pd.DataFrame, preview: bool = False) -> RenderJob:
+        """Membuat grafik seluruh data di background dan mengembalikan handle job"""
+        if weather_df.empty:
+            raise Exception("Error membuat grafik: DataFrame cuaca kosong, tidak bisa membuat grafik.")
+        future = self._submit_render(weather_df, preview, self.DEFAULT_TITLE)
+        return RenderJob([future], 'Grafik cuaca Jawa Timur')
+
+    def submit_kabupaten_plots(self, weather_df: pd.DataFrame, kabupaten_lookup: Mapping[str, str],
+                               preview: bool = True) -> RenderJob:
+        """Membuat satu set grafik per kabupaten secara paralel di worker pool"""
+        if weather_df.empty:
+            raise Exception("Error membuat grafik: DataFrame cuaca kosong, tidak bisa membuat grafik.")
+        keys = weather_df.index.map(lambda d: kabupaten_lookup.get(d, d))
+        futures = [
+            self._submit_render(group_df, preview, f'Analisis Cuaca {kabupaten}')
+            for kabupaten, group_df in weather_df.groupby(keys.to_numpy(), sort=True)
+        ]
+        return RenderJob(futures, f'Grafik per kabupaten ({len(futures)} set)')
+
+    def shutdown(self):
+        """Menghentikan worker pool render"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
     def get_weather_statistics(self, weather_df: pd.DataFrame) -> tuple:
         """Mendapatkan statistik cuaca untuk ditampilkan"""
         if weather_df.empty:
             return None, None
-        
-        # Statistik deskriptif
+
+        # Statistik deskriptif (satu pass vektor)
         numeric_cols = ['temperature', 'humidity', 'wind_speed', 'pressure', 'uv_index']
-        stats_df = weather_df[numeric_cols].describe()
-        
+        stats_df = StatisticsEngine.describe_frame(weather_df)[numeric_cols]
+
         # Kondisi cuaca paling umum
         condition_counts = weather_df['condition'].value_counts()
-        
-        return stats_df, condition_counts
\ No newline at end of file
+
+        return stats_df, condition_counts
@@ -0,0 +1,96 @@
+# services/render_cache.py
+"""Cache file grafik berbasis hash konten dengan batas ukuran dan eviksi LRU"""
+
+import itertools
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+
+class RenderCache:
+    """Menyimpan PNG per kunci konten; file yang paling lama tidak dipakai dibuang lebih dulu"""
+
+    def __init__(self, cache_dir: str, prefix: str, max_bytes: int, max_entries: int):
+        self.cache_dir = cache_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._tmp_ids = itertools.count()
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{self.prefix}_{key}.png")
+
+    def get(self, key: str) -> Optional[str]:
+        """Path file bila sudah ada; mtime diperbarui sebagai penanda pemakaian terakhir"""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def tmp_path_for(self, key: str) -> str:
+        """Path sementara yang unik per pemanggil, untuk di-commit setelah render selesai"""
+        return f"{self.path_for(key)}.{os.getpid()}.{threading.get_ident()}.{next(self._tmp_ids)}.tmp"
+
+    def commit(self, key: str, tmp_path: str) -> str:
+        """Memindahkan hasil render sementara ke posisi final secara atomik"""
+        path = self.path_for(key)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def put(self, key: str, render: Callable[[str], None]) -> str:
+        """Render ke file sementara lalu os.replace agar file cache tidak pernah setengah jadi"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.tmp_path_for(key)
+        try:
+            render(tmp_path)
+            return self.commit(key, tmp_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(f"{self.prefix}_") and name.endswith('.png'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Membuang file terlama sampai jumlah dan total ukuran cache di bawah batas"""
+        with self._lock:
+            if not os.path.isdir(self.cache_dir):
+                return
+            entries = sorted(self._entries())
+            total_bytes = sum(size for _, size, _ in entries)
+            while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+                _, size, path = entries.pop(0)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total_bytes -= size
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._entries() if os.path.isdir(self.cache_dir) else []
+            return {
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
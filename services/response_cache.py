@@ -0,0 +1,73 @@
+# services/response_cache.py
+"""Cache in-memory dengan TTL per entry dan eviksi LRU untuk response API"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Hashable, Optional
+
+if TYPE_CHECKING:
+    from models.weather_data import WeatherData
+
+
+class ResponseCache:
+    """Cache thread-safe: entry kadaluarsa setelah TTL-nya habis, entry terlama dibuang saat penuh"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional['WeatherData']:
+        """Mengambil entry yang masih segar, atau None bila tidak ada/kadaluarsa"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: 'WeatherData', expires_at: float):
+        """Menyimpan entry sampai waktu expires_at (epoch detik)"""
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def expires_at(self, key: Hashable) -> Optional[float]:
+        """Waktu kadaluarsa entry (epoch detik), None bila tidak ada; tidak dihitung sebagai hit/miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def invalidate(self, key: Hashable = None):
+        """Menghapus satu entry, atau seluruh cache bila key tidak diberikan"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        """Statistik hit/miss cache"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
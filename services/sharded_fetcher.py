@@ -0,0 +1,141 @@
+# services/sharded_fetcher.py
+"""Engine sharded: registry kecamatan dipecah ke beberapa proses, masing-masing fetch + parse sendiri
+
+Tiap proses menjalankan fetcher konkuren miliknya (threaded/async) dan membangun array bertipe lewat
+WeatherFrameBuilder; hasilnya dikirim ke proses induk sebagai blob biner (WeatherFrameBuilder.to_bytes)
+lalu digabung menjadi satu builder, sehingga decode JSON dan pembentukan record tidak berebut satu GIL.
+Kecamatan yang masih segar di cache response proses induk tidak dikirim ke shard; hasil shard beserta
+waktu kadaluarsanya dimasukkan kembali ke cache induk, dan metrik counter/histogram dari worker
+digabung ke REGISTRY induk.
+"""
+
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from config.config import API_CONFIG, FILE_CONFIG
+from models.frame_builder import WeatherFrameBuilder
+from services.district_registry import District
+from services.metrics import REGISTRY
+
+
+def fetch_shard(api_key: str, district_ids: List[int], api_config: Dict,
+                file_config: Dict) -> Tuple[bytes, List[Optional[float]], Dict[str, List]]:
+    """Dijalankan di proses worker: fetch dan parse satu shard
+
+    Mengembalikan (array bertipe sebagai bytes, waktu kadaluarsa cache per baris, metrik worker).
+    """
+    # Proses spawn memuat config dari file; terapkan config induk (termasuk perubahan saat runtime)
+    API_CONFIG.update(api_config)
+    FILE_CONFIG.update(file_config)
+    # Proses worker bisa dipakai ulang untuk shard berikutnya: metrik dikirim per shard, bukan kumulatif
+    REGISTRY.clear()
+    from services.weather_api import WeatherAPIService
+
+    service = WeatherAPIService(api_key)
+    try:
+        districts = [service.registry.get_by_id(district_id) for district_id in district_ids]
+        districts = [district for district in districts if district is not None]
+        if API_CONFIG['shard_engine'] == 'async':
+            from services.async_fetcher import AsyncWeatherFetcher
+            records = AsyncWeatherFetcher(service, verbose=False).run(districts)
+        else:
+            records = list(service.iter_weather_data_threaded(districts=districts, verbose=False))
+        builder = WeatherFrameBuilder(len(records))
+        builder.extend(records)
+        queries = {district.key: district.query for district in districts}
+        expiries = [service.cache.expires_at(queries[record.district]) for record in records]
+        return builder.to_bytes(), expiries, REGISTRY.export_state()
+    finally:
+        service.transport.close()
+
+
+class ShardedWeatherFetcher:
+    """Membagi kecamatan ke pool proses; batas rate dan konkurensi dibagi rata agar total ke API tetap sama"""
+
+    def __init__(self, api_service, processes: int = None):
+        self.api_service = api_service
+        self.processes = processes or API_CONFIG['shard_processes'] or os.cpu_count() or 1
+
+    def shard_count(self, district_count: int) -> int:
+        """Jumlah shard: tidak lebih dari jumlah proses dan tiap shard minimal shard_min_districts"""
+        by_size = max(1, district_count // max(1, API_CONFIG['shard_min_districts']))
+        return max(1, min(self.processes, by_size))
+
+    @staticmethod
+    def split(districts: List[District], shards: int) -> List[List[int]]:
+        """Pembagian round-robin sehingga urutan prioritas tersebar rata ke semua shard"""
+        return [[district.id for district in districts[i::shards]] for i in range(shards)]
+
+    @staticmethod
+    def worker_config(shards: int) -> Dict:
+        """Salinan API_CONFIG untuk satu worker dengan rate limit dan konkurensi dibagi per shard"""
+        config = dict(API_CONFIG)
+        if config['rate_limit_per_minute'] > 0:
+            config['rate_limit_per_minute'] = config['rate_limit_per_minute'] / shards
+        config['rate_limit_burst'] = max(1, config['rate_limit_burst'] // shards)
+        config['concurrency_max'] = max(config['concurrency_min'], math.ceil(config['concurrency_max'] / shards))
+        config['max_workers'] = min(config['max_workers'], config['concurrency_max'])
+        config['async_concurrency'] = max(1, math.ceil(config['async_concurrency'] / shards))
+        return config
+
+    def run(self, districts: List[District] = None, verbose: bool = True) -> WeatherFrameBuilder:
+        """Fetch semua shard secara paralel dan gabungkan hasilnya ke satu WeatherFrameBuilder"""
+        districts = list(self.api_service.registry) if districts is None else districts
+        builder = WeatherFrameBuilder(len(districts))
+
+        # Yang masih segar di cache tidak perlu ke worker
+        cached, pending = [], []
+        for district in districts:
+            record = self.api_service.get_cached(district)
+            if record is not None:
+                cached.append(record)
+            else:
+                pending.append(district)
+        builder.extend(cached)
+        if not pending:
+            return builder
+
+        shards = self.shard_count(len(pending))
+        if shards == 1:
+            # Satu shard tidak sebanding dengan biaya spawn proses: fetch di proses ini
+            builder.extend(list(self.api_service.iter_weather_data_threaded(districts=pending, verbose=verbose)))
+            return builder
+
+        api_config = self.worker_config(shards)
+        file_config = dict(FILE_CONFIG)
+        # spawn: proses induk bisa punya thread aktif (scheduler, server) yang tidak aman di-fork
+        context = multiprocessing.get_context('spawn')
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=shards, mp_context=context) as executor:
+            futures = {
+                executor.submit(fetch_shard, self.api_service.api_key, ids, api_config, file_config): len(ids)
+                for ids in self.split(pending, shards)
+            }
+            for completed_count, future in enumerate(as_completed(futures), 1):
+                try:
+                    blob, expiries, metrics_state = future.result()
+                    before = builder.size
+                    builder.extend_encoded(blob)
+                    REGISTRY.merge_state(metrics_state)
+                    self._fill_cache(builder, before, expiries)
+                    if verbose:
+                        print(f"✓ Shard {completed_count}/{shards}: {builder.size - before}/{futures[future]} kecamatan "
+                              f"({time.perf_counter() - start:.1f}s)")
+                except Exception as e:
+                    if verbose:
+                        print(f"✗ Shard {completed_count}/{shards} gagal: {e}")
+        return builder
+
+    def _fill_cache(self, builder: WeatherFrameBuilder, start: int, expiries: List[Optional[float]]):
+        """Memasukkan baris hasil shard (mulai dari start) ke cache response proses induk"""
+        if API_CONFIG['cache_ttl'] <= 0:
+            return
+        by_key = self.api_service.districts
+        for record, expires_at in zip(builder.records(start), expiries):
+            district = by_key.get(record.district)
+            if district is not None and expires_at is not None:
+                self.api_service.cache.set(district.query, record, expires_at)
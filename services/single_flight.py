@@ -0,0 +1,92 @@
+# services/single_flight.py
+"""Single-flight: pemanggil dengan key yang sama selama pekerjaan berjalan menunggu dan berbagi hasilnya"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from services.metrics import SINGLE_FLIGHT_CALLS
+
+
+class _Call:
+    __slots__ = ('event', 'owner', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.owner = threading.get_ident()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Menjalankan paling banyak satu pekerjaan per key; pemanggil lain menerima hasil atau error yang sama"""
+
+    def __init__(self, scope: str):
+        self.scope = scope
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Hasil fn(); bila key yang sama sedang berjalan, tunggu dan kembalikan hasil pekerjaan itu"""
+        with self._lock:
+            call = self._calls.get(key)
+            reentrant = call is not None and call.owner == threading.get_ident()
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+            elif not reentrant:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+
+        if reentrant:
+            # Dipanggil ulang dari dalam fn di thread yang sama: jalankan langsung agar tidak deadlock
+            return fn()
+        if not leader:
+            SINGLE_FLIGHT_CALLS.inc(scope=self.scope, result='shared')
+            return self._wait(call)
+
+        SINGLE_FLIGHT_CALLS.inc(scope=self.scope, result='executed')
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def join(self, key: Hashable) -> Tuple[bool, Any]:
+        """(True, hasil) bila key sedang berjalan (setelah menunggunya selesai), (False, None) bila tidak"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None or call.owner == threading.get_ident():
+                return False, None
+            call.waiters += 1
+            self.shared += 1
+        SINGLE_FLIGHT_CALLS.inc(scope=self.scope, result='shared')
+        return True, self._wait(call)
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    @staticmethod
+    def _wait(call: _Call) -> Any:
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executed': self.executed,
+                'shared': self.shared
+            }
@@ -0,0 +1,104 @@
+# services/snapshot_store.py
+"""Penyimpanan snapshot DataFrame cuaca terakhir untuk warm start
+
+Format Parquet (pyarrow) dipakai bila tersedia: dtype frame (float32, Int16, kategori) ikut tersimpan dan
+membaca file tidak menjalankan kode apa pun. Tanpa pyarrow snapshot disimpan sebagai pickle (.pkl).
+"""
+
+import io
+import os
+import pickle
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+import pandas as pd
+
+from config.config import FILE_CONFIG
+from utils.helpers import is_module_available
+
+PYARROW_AVAILABLE = is_module_available('pyarrow')
+# Waktu fetch disimpan di metadata skema Parquet
+FETCHED_AT_KEY = b'weather.fetched_at'
+
+
+@contextmanager
+def atomic_open(file_path: str) -> Iterator[BinaryIO]:
+    """File biner yang muncul di file_path hanya bila blok selesai tanpa error (tmp, fsync, os.replace)"""
+    folder = os.path.dirname(file_path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.tmp_', suffix=os.path.basename(file_path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_bytes(file_path: str, payload: bytes):
+    """Menulis file secara atomik: tulis ke file sementara, fsync, lalu os.replace"""
+    with atomic_open(file_path) as f:
+        f.write(payload)
+
+
+class SnapshotStore:
+    """Menyimpan dan memuat snapshot DataFrame beserta waktu fetch-nya"""
+
+    def __init__(self, file_path: str = None):
+        self.file_path = file_path or os.path.join(FILE_CONFIG['data_dir'], FILE_CONFIG['snapshot_file'])
+        if self.use_parquet and not PYARROW_AVAILABLE:
+            self.file_path = os.path.splitext(self.file_path)[0] + '.pkl'
+
+    @property
+    def use_parquet(self) -> bool:
+        return self.file_path.endswith('.parquet')
+
+    def save(self, weather_df: pd.DataFrame, fetched_at: datetime = None):
+        """Menyimpan snapshot (ditulis atomik agar aman dari crash)"""
+        fetched_at = fetched_at or datetime.now()
+        if self.use_parquet:
+            atomic_write_bytes(self.file_path, self._to_parquet(weather_df, fetched_at))
+            return
+        payload = {
+            'fetched_at': fetched_at,
+            'weather_df': weather_df
+        }
+        atomic_write_bytes(self.file_path, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _to_parquet(weather_df: pd.DataFrame, fetched_at: datetime) -> bytes:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(weather_df, preserve_index=True)
+        metadata = {**(table.schema.metadata or {}), FETCHED_AT_KEY: fetched_at.isoformat().encode('ascii')}
+        buffer = io.BytesIO()
+        pq.write_table(table.replace_schema_metadata(metadata), buffer, compression='zstd')
+        return buffer.getvalue()
+
+    def load(self) -> Optional[Tuple[pd.DataFrame, datetime]]:
+        """Memuat snapshot terakhir, None bila belum ada atau tidak bisa dibaca (aplikasi lalu fetch ulang)"""
+        try:
+            if self.use_parquet:
+                return self._read_parquet()
+            with open(self.file_path, 'rb') as f:
+                payload = pickle.load(f)
+            return payload['weather_df'], payload['fetched_at']
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # file rusak, versi pandas/numpy/pyarrow berbeda, dsb.
+            print(f"Snapshot tidak dapat dibaca, diabaikan: {e}")
+            return None
+
+    def _read_parquet(self) -> Tuple[pd.DataFrame, datetime]:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(self.file_path)
+        fetched_at = datetime.fromisoformat(table.schema.metadata[FETCHED_AT_KEY].decode('ascii'))
+        return table.to_pandas(), fetched_at
@@ -0,0 +1,235 @@
+# services/stub_server.py
+"""Server lokal pengganti WeatherAPI (current.json dan q=bulk) untuk pengujian tanpa kuota
+
+Latensi, rasio error 5xx, dan injeksi 429 bisa diatur untuk benchmark dan uji ketahanan.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+CONDITIONS = ['Sunny', 'Partly cloudy', 'Cloudy', 'Overcast', 'Mist',
+              'Patchy rain possible', 'Light rain', 'Moderate rain', 'Thundery outbreaks possible']
+WIND_DIRECTIONS = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
+
+
+def fake_weather(query: str) -> Dict:
+    """Data cuaca deterministik untuk satu query (nilai sama untuk q yang sama)"""
+    seed = zlib.crc32(query.encode('utf-8'))
+    now = int(time.time())
+    last_updated_epoch = now - now % 900
+    return {
+        'location': {'name': query.split(',')[0].strip(), 'region': 'East Java', 'country': 'Indonesia'},
+        'current': {
+            'last_updated_epoch': last_updated_epoch,
+            'last_updated': time.strftime('%Y-%m-%d %H:%M', time.localtime(last_updated_epoch)),
+            'temp_c': 24 + seed % 120 / 10,
+            'feelslike_c': 26 + seed % 140 / 10,
+            'humidity': 50 + seed % 50,
+            'wind_kph': seed % 300 / 10,
+            'wind_dir': WIND_DIRECTIONS[seed % len(WIND_DIRECTIONS)],
+            'condition': {'text': CONDITIONS[seed % len(CONDITIONS)]},
+            'vis_km': 5 + seed % 6,
+            'pressure_mb': 1005 + seed % 10,
+            'uv': seed % 12
+        }
+    }
+
+
+class LatencyModel:
+    """Distribusi latensi respon dalam detik: none, fixed, uniform, normal, lognormal, exponential"""
+
+    DISTRIBUTIONS = ('none', 'fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+    def __init__(self, distribution: str = 'none', a: float = 0.0, b: float = 0.0):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Distribusi latensi tidak dikenal: {distribution}")
+        self.distribution = distribution
+        self.a = a
+        self.b = b
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyModel':
+        """Format 'distribusi:a,b', misal 'fixed:0.05', 'uniform:0.01,0.2', 'lognormal:0.05,0.6'
+
+        a/b: fixed=detik, uniform=min,max, normal=mean,std, lognormal=median,sigma, exponential=mean
+        """
+        name, _, params = spec.partition(':')
+        values = [float(v) for v in params.split(',') if v]
+        return cls(name, *values[:2])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == 'fixed':
+            delay = self.a
+        elif self.distribution == 'uniform':
+            delay = rng.uniform(self.a, self.b)
+        elif self.distribution == 'normal':
+            delay = rng.gauss(self.a, self.b)
+        elif self.distribution == 'lognormal':
+            delay = self.a * rng.lognormvariate(0.0, self.b)
+        elif self.distribution == 'exponential':
+            delay = rng.expovariate(1.0 / self.a) if self.a > 0 else 0.0
+        else:
+            delay = 0.0
+        return max(0.0, delay)
+
+    def __repr__(self) -> str:
+        return f"{self.distribution}:{self.a},{self.b}"
+
+
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    """Handler HTTP/1.1 (keep-alive) yang meniru endpoint current.json"""
+
+    protocol_version = 'HTTP/1.1'
+    # Header dan body ditulis terpisah; tanpa TCP_NODELAY klien keep-alive kena jeda delayed-ACK ~40 ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict, headers: Dict = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _inject_fault(self) -> bool:
+        """Menunggu latensi simulasi lalu mengirim 429/5xx bila undian fault kena; True bila sudah dijawab"""
+        delay, fault = self.server.next_outcome()
+        if delay:
+            time.sleep(delay)
+        if fault == 429:
+            self._send_json(429, {'error': {'code': 2007, 'message': 'API key has exceeded calls per month quota.'}},
+                            {'Retry-After': str(self.server.retry_after)})
+            return True
+        if fault:
+            self._send_json(fault, {'error': {'code': 9999, 'message': 'Internal application error.'}})
+            return True
+        return False
+
+    def _query(self) -> Dict:
+        return {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+
+    def do_GET(self):
+        if self._inject_fault():
+            return
+        q = self._query().get('q')
+        if not q:
+            self._send_json(400, {'error': {'code': 1003, 'message': 'Parameter q is missing.'}})
+            return
+        self._send_json(200, fake_weather(q))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if self._inject_fault():
+            return
+        if self._query().get('q') != 'bulk':
+            self._send_json(400, {'error': {'code': 1005, 'message': 'API request url is invalid.'}})
+            return
+
+        items = []
+        for location in body.get('locations', []):
+            query = {'custom_id': location.get('custom_id'), 'q': location.get('q')}
+            if location.get('q') in self.server.failing_queries:
+                query['error'] = {'code': 1006, 'message': 'No matching location found.'}
+            else:
+                query.update(fake_weather(location['q']))
+            items.append({'query': query})
+        self._send_json(200, {'bulk': items})
+
+
+class StubWeatherServer(ThreadingHTTPServer):
+    """Server stub; failing_queries membuat item bulk tertentu mengembalikan error
+
+    latency mengatur waktu respon, error_rate peluang respon 500/503, throttle_rate peluang 429
+    (dengan header Retry-After). seed membuat urutan latensi dan fault bisa diulang.
+    """
+
+    daemon_threads = True
+    ERROR_STATUSES = (500, 503)
+
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', 0), failing_queries=(),
+                 latency: Optional[LatencyModel] = None, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: int = 1, seed: int = None):
+        super().__init__(address, StubWeatherHandler)
+        self.failing_queries = set(failing_queries)
+        self.latency = latency or LatencyModel()
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        self.throttled_count = 0
+
+    def next_outcome(self) -> Tuple[float, Optional[int]]:
+        """Mengundi (latensi, status fault atau None) untuk satu request"""
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency.sample(self._rng)
+            roll = self._rng.random()
+            if roll < self.throttle_rate:
+                self.throttled_count += 1
+                return delay, 429
+            if roll < self.throttle_rate + self.error_rate:
+                self.error_count += 1
+                return delay, self._rng.choice(self.ERROR_STATUSES)
+            return delay, None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'requests': self.request_count,
+                'errors': self.error_count,
+                'throttled': self.throttled_count
+            }
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1/current.json"
+
+    def start_background(self) -> threading.Thread:
+        """Menjalankan server di thread daemon"""
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub server WeatherAPI lokal")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='none',
+                        help="distribusi latensi, misal 'fixed:0.05', 'uniform:0.01,0.2', 'lognormal:0.05,0.6'")
+    parser.add_argument('--error-rate', type=float, default=0.0, help='peluang respon 500/503 (0-1)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='peluang respon 429 (0-1)')
+    parser.add_argument('--retry-after', type=int, default=1, help='nilai header Retry-After untuk 429 (detik)')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server = StubWeatherServer((args.host, args.port), latency=LatencyModel.parse(args.latency),
+                               error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                               retry_after=args.retry_after, seed=args.seed)
+    print(f"Stub WeatherAPI berjalan di {server.base_url} (latensi {server.latency!r}, "
+          f"error {args.error_rate:.0%}, 429 {args.throttle_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
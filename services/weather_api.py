@@ -1,96 +1,125 @@
 # services/weather_api.py
 import requests
-from typing import Dict, List, Optional
+import time
+from typing import Dict, Iterator, List, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from config.config import API_CONFIG
+from services.http_transport import HTTPTransport
+from services.async_fetcher import AsyncWeatherFetcher
+from services.response_cache import ResponseCache
+from services.district_registry import District, DistrictRegistry
+from services.json_codec import loads
+from services.single_flight import SingleFlight
+from services.metrics import API_CONCURRENCY_LIMIT, CACHE_ENTRIES, CACHE_LOOKUPS, PARSE_SECONDS
+from models.weather_data import WeatherData
 
 class WeatherAPIService:
     """Service untuk mengambil data cuaca dari API"""
     
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.base_url = "http://api.weatherapi.com/v1/current.json"
+        self.base_url = API_CONFIG['base_url']
+        self.transport = HTTPTransport()
+        self.cache = ResponseCache(API_CONFIG['cache_max_entries'])
+        # Fetch lokasi yang sama secara bersamaan digabung menjadi satu request HTTP
+        self.inflight = SingleFlight('location')
         
-        # Daftar kecamatan di Jawa Timur
-        self.districts = {
-            'Surabaya': ['Surabaya', 'East Java', 'Indonesia'],
-            'Malang': ['Malang', 'East Java', 'Indonesia'],
-            'Kediri': ['Kediri', 'East Java', 'Indonesia'],
-            'Blitar': ['Blitar', 'East Java', 'Indonesia'],
-            'Madiun': ['Madiun', 'East Java', 'Indonesia'],
-            'Mojokerto': ['Mojokerto', 'East Java', 'Indonesia'],
-            'Pasuruan': ['Pasuruan', 'East Java', 'Indonesia'],
-            'Probolinggo': ['Probolinggo', 'East Java', 'Indonesia'],
-            'Sidoarjo': ['Sidoarjo', 'East Java', 'Indonesia'],
-            'Gresik': ['Gresik', 'East Java', 'Indonesia'],
-            'Jember': ['Jember', 'East Java', 'Indonesia'],
-            'Banyuwangi': ['Banyuwangi', 'East Java', 'Indonesia'],
-            'Tulungagung': ['Tulungagung', 'East Java', 'Indonesia'],
-            'Lumajang': ['Lumajang', 'East Java', 'Indonesia'],
-            'Bondowoso': ['Bondowoso', 'East Java', 'Indonesia'],
-            'Situbondo': ['Situbondo', 'East Java', 'Indonesia'],
-            'Ngawi': ['Ngawi', 'East Java', 'Indonesia'],
-            'Bojonegoro': ['Bojonegoro', 'East Java', 'Indonesia'],
-            'Tuban': ['Tuban', 'East Java', 'Indonesia'],
-            'Lamongan': ['Lamongan', 'East Java', 'Indonesia']
+        # Registry kecamatan di Jawa Timur (dimuat dari FILE_CONFIG['districts_file'])
+        self.registry = DistrictRegistry.from_csv()
+        self.districts = self.registry.by_key
+        
+        # Gauge dibaca langsung dari state service saat metrik diekspos
+        CACHE_ENTRIES.set_function(lambda: len(self.cache))
+        API_CONCURRENCY_LIMIT.set_function(lambda: self.transport.concurrency.stats()['limit'])
+    
+    def build_params(self, district: District) -> Dict:
+        """Membuat query parameter API untuk satu kecamatan"""
+        return {
+            'key': self.api_key,
+            'q': district.query,
+            'aqi': 'no'
         }
     
-    def fetch_weather_data(self, district: str, location_parts: List[str]) -> Optional[Dict]:
-        """Mengambil data cuaca dari API untuk satu kecamatan"""
+    @staticmethod
+    def parse_weather_response(district: str, data: Dict) -> WeatherData:
+        """Mengubah response JSON API menjadi record cuaca (hanya field yang dipakai yang dibaca)"""
+        return WeatherData.from_api(district, data)
+    
+    @staticmethod
+    def _cache_expiry(data: Dict) -> float:
+        """Entry segar sampai data API berikutnya diperkirakan terbit (last_updated + TTL)"""
+        now = time.time()
+        ttl = API_CONFIG['cache_ttl']
+        last_updated_epoch = data.get('current', {}).get('last_updated_epoch')
+        if last_updated_epoch is None:
+            return now + ttl
+        return min(now + ttl, max(now + API_CONFIG['cache_min_ttl'], last_updated_epoch + ttl))
+    
+    def get_cached(self, district: District) -> Optional[WeatherData]:
+        """Mengambil record dari cache bila masih segar"""
+        if API_CONFIG['cache_ttl'] <= 0:
+            return None
+        cached = self.cache.get(district.query)
+        CACHE_LOOKUPS.inc(result='miss' if cached is None else 'hit')
+        return cached
+    
+    def handle_response(self, district: District, data: Dict) -> WeatherData:
+        """Parse response API dan simpan hasilnya ke cache"""
+        record = self.parse_weather_response(district.key, data)
+        if API_CONFIG['cache_ttl'] > 0:
+            self.cache.set(district.query, record, self._cache_expiry(data))
+        return record
+    
+    def fetch_weather_data(self, district: District, verbose: bool = True) -> Optional[WeatherData]:
+        """Mengambil data cuaca dari API untuk satu kecamatan (memakai cache bila masih segar)"""
+        cached = self.get_cached(district)
+        if cached is not None:
+            return cached
+        return self._fetch_uncached(district, verbose)
+    
+    def _fetch_uncached(self, district: District, verbose: bool = True) -> Optional[WeatherData]:
+        """Request ke API tanpa memeriksa cache lagi (pemanggil sudah mencatat miss-nya)"""
+        return self.inflight.do(district.query, lambda: self._request_weather_data(district, verbose))
+    
+    def _request_weather_data(self, district: District, verbose: bool = True) -> Optional[WeatherData]:
+        """Satu request HTTP untuk kecamatan; pemanggil bersamaan berbagi hasilnya lewat single-flight"""
         try:
-            location = f"{location_parts[0]}, {location_parts[1]}, {location_parts[2]}"
-            params = {
-                'key': self.api_key,
-                'q': location,
-                'aqi': 'no'
-            }
-            
-            response = requests.get(self.base_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            current = data['current']
-            location_info = data['location']
-            
-            weather_dict = {
-                'location': location_info['name'],
-                'district': district,
-                'temperature': current['temp_c'],
-                'feels_like': current['feelslike_c'],
-                'humidity': current['humidity'],
-                'wind_speed': current['wind_kph'],
-                'wind_direction': current['wind_dir'],
-                'condition': current['condition']['text'],
-                'visibility': current['vis_km'],
-                'pressure': current['pressure_mb'],
-                'uv_index': current['uv'],
-                'last_updated': current['last_updated']
-            }
-            
-            return weather_dict
+            params = self.build_params(district)
+            response = self.transport.get(self.base_url, params=params)
+            with PARSE_SECONDS.time(kind='single'):
+                return self.handle_response(district, loads(response.content))
             
         except requests.RequestException as e:
-            print(f"Error fetching data for {district}: {e}")
+            if verbose:
+                print(f"Error fetching data for {district.key}: {e}")
             return None
-        except KeyError as e:
-            print(f"Error parsing data for {district}: {e}")
+        except (KeyError, ValueError) as e:
+            if verbose:
+                print(f"Error parsing data for {district.key}: {e}")
             return None
     
-    def fetch_all_weather_data_threaded(self, max_workers: int = 5) -> List[Dict]:
-        """Mengambil data cuaca untuk semua kecamatan menggunakan threading"""
-        print("Mengambil data cuaca untuk seluruh Jawa Timur...")
-        
-        weather_data_list = []
+    def _thread_count(self, max_workers: Optional[int]) -> int:
+        """Jumlah thread executor; konkurensi efektif diatur oleh transport.concurrency"""
+        max_workers = max_workers or self.transport.concurrency.max_limit
+        self.transport.ensure_pool_size(max_workers)
+        return max_workers
+    
+    def iter_weather_data_threaded(self, max_workers: int = None, districts: List[District] = None,
+                                   verbose: bool = True) -> Iterator[WeatherData]:
+        """Generator yang menghasilkan record cuaca satu per satu segera setelah selesai diambil"""
+        max_workers = self._thread_count(max_workers)
+        districts = list(self.registry) if districts is None else districts
         
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit semua task
+            # Submit semua task (urutan submit = urutan prioritas)
             future_to_district = {
-                executor.submit(self.fetch_weather_data, district, location_parts): district
-                for district, location_parts in self.districts.items()
+                executor.submit(self.fetch_weather_data, district, verbose): district.key
+                for district in districts
             }
             
             # Collect results
             completed_count = 0
-            total_count = len(self.districts)
+            total_count = len(districts)
             
             for future in as_completed(future_to_district):
                 district = future_to_district[future]
@@ -99,12 +128,124 @@ class WeatherAPIService:
                 try:
                     result = future.result()
                     if result:
-                        weather_data_list.append(result)
-                        print(f"✓ Data {district} berhasil diambil ({completed_count}/{total_count})")
-                    else:
+                        if verbose:
+                            print(f"✓ Data {district} berhasil diambil ({completed_count}/{total_count})")
+                        yield result
+                    elif verbose:
                         print(f"✗ Gagal mengambil data {district} ({completed_count}/{total_count})")
                 except Exception as e:
-                    print(f"✗ Error untuk {district}: {e} ({completed_count}/{total_count})")
+                    if verbose:
+                        print(f"✗ Error untuk {district}: {e} ({completed_count}/{total_count})")
+    
+    def fetch_all_weather_data_threaded(self, max_workers: int = None) -> List[WeatherData]:
+        """Mengambil data cuaca untuk semua kecamatan menggunakan threading"""
+        print("Mengambil data cuaca untuk seluruh Jawa Timur...")
+        
+        weather_data_list = list(self.iter_weather_data_threaded(max_workers))
         
         print(f"\nSelesai! Berhasil mengambil data {len(weather_data_list)} kecamatan")
-        return weather_data_list
\ No newline at end of file
+        self.print_fetch_stats()
+        return weather_data_list
+    
+    def fetch_all_weather_data_async(self, concurrency: int = None, districts: List[District] = None,
+                                     verbose: bool = True) -> List[WeatherData]:
+        """Mengambil data cuaca untuk semua kecamatan (atau subset districts) menggunakan asyncio"""
+        if verbose:
+            print("Mengambil data cuaca untuk seluruh Jawa Timur (async)...")
+        districts = list(self.registry) if districts is None else districts
+        
+        weather_data_list = []
+        pending = []
+        for district in districts:
+            cached = self.get_cached(district)
+            if cached is not None:
+                weather_data_list.append(cached)
+            else:
+                pending.append(district)
+        
+        if pending:
+            fetcher = AsyncWeatherFetcher(self, concurrency, verbose=verbose)
+            weather_data_list.extend(fetcher.run(pending))
+        
+        if verbose:
+            print(f"\nSelesai! Berhasil mengambil data {len(weather_data_list)} dari {len(districts)} kecamatan")
+            self.print_fetch_stats()
+        return weather_data_list
+    
+    def fetch_bulk_batch(self, batch: List[District], verbose: bool = True) -> List[WeatherData]:
+        """Mengambil satu batch kecamatan dalam satu POST bulk, fallback per lokasi untuk yang gagal"""
+        body = {'locations': [{'q': district.query, 'custom_id': str(district.id)} for district in batch]}
+        params = {'key': self.api_key, 'q': 'bulk', 'aqi': 'no'}
+        
+        results = {}
+        try:
+            response = self.transport.post(self.base_url, params=params, json=body)
+            with PARSE_SECONDS.time(kind='bulk'):
+                data = loads(response.content)
+                items = data.get('bulk') if isinstance(data, dict) else None
+                for item in items if isinstance(items, list) else []:
+                    query = item.get('query') if isinstance(item, dict) else None
+                    if not isinstance(query, dict):
+                        continue  # item rusak: diambil ulang per lokasi
+                    try:
+                        district = self.registry.get_by_id(int(query.get('custom_id')))
+                    except (TypeError, ValueError):
+                        continue  # custom_id hilang/null/bukan angka: item dilewati, diambil ulang per lokasi
+                    if district is None or 'error' in query:
+                        continue
+                    try:
+                        results[district.id] = self.handle_response(district, query)
+                    except (KeyError, TypeError) as e:
+                        if verbose:
+                            print(f"Error parsing data for {district.key}: {e}")
+        except (requests.RequestException, ValueError) as e:
+            if verbose:
+                print(f"Error bulk request ({len(batch)} lokasi): {e}")
+        
+        # Fallback ke request per lokasi untuk item yang gagal/hilang; cache sudah diperiksa sebelum batch dibentuk
+        for district in batch:
+            if district.id not in results:
+                record = self._fetch_uncached(district, verbose)
+                if record:
+                    results[district.id] = record
+        
+        return list(results.values())
+    
+    def fetch_all_weather_data_bulk(self, batch_size: int = None, max_workers: int = None,
+                                    districts: List[District] = None, verbose: bool = True) -> List[WeatherData]:
+        """Mengambil data cuaca semua kecamatan (atau subset districts) dengan request bulk (banyak lokasi per POST)"""
+        if verbose:
+            print("Mengambil data cuaca untuk seluruh Jawa Timur (bulk)...")
+        batch_size = batch_size or API_CONFIG['bulk_batch_size']
+        districts = list(self.registry) if districts is None else districts
+        
+        weather_data_list = []
+        pending = []
+        for district in districts:
+            cached = self.get_cached(district)
+            if cached is not None:
+                weather_data_list.append(cached)
+            else:
+                pending.append(district)
+        
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        max_workers = self._thread_count(max_workers)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.fetch_bulk_batch, batch, verbose) for batch in batches]
+            for completed_count, future in enumerate(as_completed(futures), 1):
+                records = future.result()
+                weather_data_list.extend(records)
+                if verbose:
+                    print(f"✓ Batch {completed_count}/{len(batches)}: {len(records)} kecamatan")
+        
+        if verbose:
+            print(f"\nSelesai! Berhasil mengambil data {len(weather_data_list)} dari {len(districts)} kecamatan")
+            self.print_fetch_stats()
+        return weather_data_list
+    
+    def print_fetch_stats(self):
+        """Menampilkan statistik cache response dan batas konkurensi"""
+        stats = self.cache.stats()
+        print(f"Cache: {stats['hits']} hit, {stats['misses']} miss, {stats['entries']} entry")
+        print(f"Konkurensi adaptif: {self.transport.concurrency.stats()['limit']}")
\ No newline at end of file
@@ -0,0 +1,29 @@
+# tests/conftest.py
+"""Fixture bersama: stub server lokal dan config yang diarahkan ke stub serta direktori sementara"""
+
+import pytest
+
+from config.config import API_CONFIG, FILE_CONFIG, METRICS_CONFIG
+from services.stub_server import StubWeatherServer
+
+
+@pytest.fixture
+def stub_server():
+    server = StubWeatherServer(('127.0.0.1', 0), seed=0)
+    server.start_background()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api_config(stub_server, tmp_path, monkeypatch):
+    monkeypatch.setitem(API_CONFIG, 'base_url', stub_server.base_url)
+    monkeypatch.setitem(API_CONFIG, 'cache_ttl', 0)
+    monkeypatch.setitem(API_CONFIG, 'max_retries', 0)
+    monkeypatch.setitem(API_CONFIG, 'rate_limit_per_minute', 0)
+    monkeypatch.setitem(API_CONFIG, 'refresh_interval', 0)
+    monkeypatch.setitem(FILE_CONFIG, 'data_dir', str(tmp_path))
+    monkeypatch.setitem(FILE_CONFIG, 'history_dir', str(tmp_path / 'history'))
+    monkeypatch.setitem(METRICS_CONFIG, 'textfile', None)
+    return API_CONFIG
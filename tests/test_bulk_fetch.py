@@ -0,0 +1,80 @@
+# tests/test_bulk_fetch.py
+"""fetch_bulk_batch terhadap stub server: parse, item rusak dilewati, dan fallback per lokasi"""
+
+import json
+
+import pytest
+
+from services.metrics import CACHE_LOOKUPS
+from services.weather_api import WeatherAPIService
+
+
+@pytest.fixture
+def service(api_config):
+    service = WeatherAPIService('test-key')
+    yield service
+    service.transport.close()
+
+
+def corrupt_response(service, monkeypatch, corrupt):
+    """Response bulk asli dari stub diubah oleh corrupt(payload) sebelum diparse"""
+    post = service.transport.post
+
+    def corrupted_post(*args, **kwargs):
+        response = post(*args, **kwargs)
+        response._content = json.dumps(corrupt(json.loads(response.content))).encode()
+        return response
+    monkeypatch.setattr(service.transport, 'post', corrupted_post)
+
+
+def test_bulk_batch_parsed_from_one_request(service, stub_server):
+    batch = list(service.registry)[:5]
+    records = service.fetch_bulk_batch(batch)
+    assert sorted(record.district for record in records) == sorted(district.key for district in batch)
+    assert stub_server.stats()['requests'] == 1
+
+
+def test_failed_items_fall_back_per_location(api_config, service, stub_server):
+    batch = list(service.registry)[:5]
+    stub_server.failing_queries = {batch[1].query, batch[3].query}
+    records = service.fetch_bulk_batch(batch)
+    assert sorted(record.district for record in records) == sorted(district.key for district in batch)
+    assert stub_server.stats()['requests'] == 1 + 2
+
+
+def test_malformed_items_skipped_then_fetched(service, stub_server, monkeypatch):
+    batch = list(service.registry)[:5]
+
+    def corrupt(payload):
+        items = payload['bulk']
+        items[0]['query']['custom_id'] = None
+        items[1]['query']['custom_id'] = 'bukan-angka'
+        items[2] = ['bukan', 'dict']
+        items[3]['query'] = 'bukan dict'
+        return payload
+    corrupt_response(service, monkeypatch, corrupt)
+
+    records = service.fetch_bulk_batch(batch)
+    assert sorted(record.district for record in records) == sorted(district.key for district in batch)
+    assert stub_server.stats()['requests'] == 1 + 4
+
+
+@pytest.mark.parametrize('payload', [[], {'bulk': None}, {'bulk': {'query': {}}}])
+def test_malformed_body_falls_back(service, stub_server, monkeypatch, payload):
+    batch = list(service.registry)[:3]
+    corrupt_response(service, monkeypatch, lambda _: payload)
+    records = service.fetch_bulk_batch(batch)
+    assert len(records) == len(batch)
+    assert stub_server.stats()['requests'] == 1 + len(batch)
+
+
+def test_fallback_counts_each_cache_miss_once(api_config, service, stub_server, monkeypatch):
+    monkeypatch.setitem(api_config, 'cache_ttl', 900)
+    districts = list(service.registry)[:4]
+    stub_server.failing_queries = {district.query for district in districts}
+    misses = CACHE_LOOKUPS.value(result='miss')
+
+    records = service.fetch_all_weather_data_bulk(districts=districts, verbose=False)
+
+    assert len(records) == len(districts)
+    assert CACHE_LOOKUPS.value(result='miss') - misses == len(districts)
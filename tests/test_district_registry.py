@@ -0,0 +1,48 @@
+# tests/test_district_registry.py
+"""DistrictRegistry: id sebagai primary key, nama kecamatan boleh sama di kabupaten berbeda"""
+
+import pytest
+
+from models.frame_builder import WeatherFrameBuilder
+from services.district_registry import District, DistrictRegistry
+from services.stub_server import fake_weather
+from services.weather_api import WeatherAPIService
+
+
+def make_registry() -> DistrictRegistry:
+    return DistrictRegistry([
+        District(1, 'Wonosari', 'Gunungkidul', 'DI Yogyakarta', 'Indonesia'),
+        District(2, 'Wonosari', 'Malang', 'East Java', 'Indonesia'),
+        District(3, 'Malang', 'Malang', 'East Java', 'Indonesia'),
+    ])
+
+
+def test_same_name_in_different_kabupaten():
+    registry = make_registry()
+    assert len(registry) == 3
+    assert [district.id for district in registry.get_by_name('Wonosari')] == [1, 2]
+    assert registry.get('Wonosari (Gunungkidul)').id == 1
+    assert registry.get('Wonosari (Malang)').id == 2
+    assert registry.get('Malang').key == 'Malang'
+    assert 'Wonosari (Malang)' in registry and 'Wonosari' not in registry
+
+
+def test_duplicate_id_rejected():
+    registry = make_registry()
+    with pytest.raises(ValueError):
+        registry.add(District(2, 'Singosari', 'Malang', 'East Java', 'Indonesia'))
+    assert registry.get_by_id(2).name == 'Wonosari'
+
+
+def test_duplicate_name_in_same_kabupaten_rejected():
+    registry = make_registry()
+    with pytest.raises(ValueError):
+        registry.add(District(4, 'Wonosari', 'Malang', 'East Java', 'Indonesia'))
+
+
+def test_frame_index_uses_display_key():
+    builder = WeatherFrameBuilder(3)
+    for district in make_registry():
+        builder.append(WeatherAPIService.parse_weather_response(district.key, fake_weather(district.query)))
+    weather_df = builder.build()
+    assert list(weather_df.index) == ['Wonosari (Gunungkidul)', 'Wonosari (Malang)', 'Malang']
@@ -0,0 +1,26 @@
+# tests/test_metrics.py
+"""Penggabungan metrik antar registry (dipakai engine sharded) dan kontrak _Metric"""
+
+import pytest
+
+from services.metrics import MetricsRegistry, _Metric
+
+
+def test_metric_base_is_abstract():
+    with pytest.raises(TypeError):
+        _Metric('weather_test', 'dokumentasi')
+
+
+def test_merge_state_sums_counters_and_histograms():
+    worker, parent = MetricsRegistry(), MetricsRegistry()
+    for registry in (worker, parent):
+        registry.counter('requests_total', 'request', ['status']).inc(status='200')
+        registry.histogram('latency_seconds', 'latensi', buckets=(0.1, 1.0)).observe(0.5)
+        registry.gauge('entries', 'entry').set(7)
+
+    parent.merge_state(worker.export_state())
+
+    assert parent.get('requests_total').value(status='200') == 2
+    assert parent.get('latency_seconds').count() == 2
+    assert parent.get('entries').value() == 7
+    assert 'entries' not in worker.export_state()
@@ -0,0 +1,25 @@
+# tests/test_name_index.py
+"""DistrictNameIndex.resolve pada nama yang bentuk kanoniknya sama setelah prefix dibuang"""
+
+from utils.name_index import DistrictNameIndex
+
+NAMES = ['Kota Malang', 'Malang', 'Kota Batu', 'Blitar', 'Kota Blitar', 'Madiun']
+
+
+def resolved(term: str):
+    return [match.name for match in DistrictNameIndex(NAMES).resolve(term)]
+
+
+def test_every_exact_match_is_returned():
+    assert resolved('malang') == ['Malang', 'Kota Malang']
+    assert resolved('Kab. Malang') == ['Malang', 'Kota Malang']
+
+
+def test_typed_prefix_ranks_first():
+    assert resolved('Kota Malang') == ['Kota Malang', 'Malang']
+    assert resolved('kota blitar') == ['Kota Blitar', 'Blitar']
+
+
+def test_single_exact_match_is_resolved():
+    assert resolved('batu') == ['Kota Batu']
+    assert resolved('Madiun') == ['Madiun']
@@ -0,0 +1,50 @@
+# tests/test_query_engine.py
+"""Regresi WeatherQueryEngine pada kolom float32 hasil WeatherFrameBuilder"""
+
+import numpy as np
+import pytest
+
+from models.frame_builder import WeatherFrameBuilder
+from models.query_engine import WeatherQueryEngine
+from models.weather_data import WeatherData
+from models.weather_snapshot import WeatherSnapshot
+
+
+def make_snapshot() -> WeatherSnapshot:
+    records = [
+        WeatherData(name, name, temperature, temperature, humidity, 5.0, 'N', 'Sunny', 10.0, 1010.0, 5.0,
+                    '2024-01-01 10:00')
+        for name, temperature, humidity in [('Madiun', 29.9, 70), ('Surabaya', 30.4, 80), ('Malang', 31.2, None)]
+    ]
+    builder = WeatherFrameBuilder(len(records))
+    builder.extend(records)
+    return WeatherSnapshot(builder.build())
+
+
+@pytest.fixture
+def snapshot() -> WeatherSnapshot:
+    return make_snapshot()
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('temperature = 30.4', ['Surabaya']),
+    ('temperature >= 30.4', ['Surabaya', 'Malang']),
+    ('temperature <= 30.4', ['Madiun', 'Surabaya']),
+    ('temperature > 30.4', ['Malang']),
+    ('temperature < 30.4', ['Madiun']),
+])
+def test_float32_column_matches_literal(snapshot, query, expected):
+    assert snapshot.frame['temperature'].dtype == np.float32
+    assert list(WeatherQueryEngine().search(snapshot, query).index) == expected
+
+
+def test_float32_predicate_on_candidate_rows(snapshot):
+    # Predikat kedua diuji lewat NumericIndex.test, bukan binary search
+    result = WeatherQueryEngine().search(snapshot, 'condition ~ sun AND temperature = 30.4')
+    assert list(result.index) == ['Surabaya']
+
+
+def test_missing_humidity_never_matches(snapshot):
+    engine = WeatherQueryEngine()
+    assert list(engine.search(snapshot, 'humidity <= 100').index) == ['Madiun', 'Surabaya']
+    assert list(engine.search(snapshot, 'humidity < 0').index) == []
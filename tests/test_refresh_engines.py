@@ -0,0 +1,53 @@
+# tests/test_refresh_engines.py
+"""Regresi: refresh yang gagal total tidak menghapus data lama, apa pun engine-nya"""
+
+import pytest
+
+from models.weather_model import WeatherModel
+from services.async_fetcher import AIOHTTP_AVAILABLE
+
+ENGINES = [
+    'threaded',
+    pytest.param('async', marks=pytest.mark.skipif(not AIOHTTP_AVAILABLE, reason='aiohttp tidak terpasang')),
+    'bulk',
+    'sharded',
+]
+
+
+@pytest.fixture
+def model(api_config):
+    return WeatherModel('test-key')
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_failed_refresh_keeps_previous_rows(model, stub_server, api_config, monkeypatch, capsys, engine):
+    monkeypatch.setitem(api_config, 'fetch_engine', engine)
+    first = model.fetch_all_weather_data(verbose=False)
+    total = len(model.get_districts())
+    assert len(first) == total
+    fetched_at = model.fetched_at
+
+    stub_server.error_rate = 1.0
+    fresh = model.fetch_all_weather_data(verbose=False)
+
+    assert fresh.empty
+    assert len(model.weather_df) == total
+    assert model.fetched_at == fetched_at
+    # verbose=False: kegagalan per kecamatan tidak dicetak
+    assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize('engine, requests', [
+    ('threaded', 3),
+    pytest.param('async', 3, marks=pytest.mark.skipif(not AIOHTTP_AVAILABLE, reason='aiohttp tidak terpasang')),
+    ('bulk', 1),
+    ('sharded', 3),
+])
+def test_partial_refresh_uses_configured_engine(model, stub_server, api_config, monkeypatch, engine, requests):
+    monkeypatch.setitem(api_config, 'fetch_engine', engine)
+    targets = list(model.get_districts())[:3]
+
+    weather_df = model.refresh_districts(targets)
+
+    assert stub_server.stats()['requests'] == requests
+    assert sorted(weather_df.index) == sorted(targets)
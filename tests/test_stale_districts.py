@@ -0,0 +1,53 @@
+# tests/test_stale_districts.py
+"""get_stale_districts memakai last_updated_epoch (waktu absolut) dan menganggap waktu kosong basi"""
+
+import time
+
+import pytest
+
+from config.config import FILE_CONFIG
+from models.frame_builder import WeatherFrameBuilder
+from models.weather_data import WeatherData
+from models.weather_model import WeatherModel
+from models.weather_snapshot import WeatherSnapshot
+
+
+def record(district: str, last_updated: str, epoch) -> WeatherData:
+    return WeatherData(district, district, 30.0, 31.0, 70, 5.0, 'N', 'Sunny', 10.0, 1010.0, 5.0, last_updated, epoch)
+
+
+@pytest.fixture
+def model(api_config):
+    return WeatherModel('test-key')
+
+
+def test_stale_by_epoch_and_missing_time(model):
+    fresh, old, unknown, invalid = list(model.get_districts())[:4]
+    now = time.time()
+    # Jam lokal sengaja tidak cocok dengan jam host: hanya epoch yang menentukan
+    records = [
+        record(fresh, '2000-01-01 00:00', now - 60),
+        record(old, '2999-01-01 00:00', now - FILE_CONFIG['snapshot_stale_after'] - 60),
+        record(unknown, '2999-01-01 00:00', None),
+        record(invalid, 'bukan tanggal', None),
+    ]
+    builder = WeatherFrameBuilder(len(records))
+    builder.extend(records)
+    model.snapshot = WeatherSnapshot(builder.build())
+
+    stale = model.get_stale_districts()
+
+    assert fresh not in stale
+    assert {old, unknown, invalid} <= set(stale)
+    assert len(stale) == len(model.get_districts()) - 1
+
+
+def test_epoch_survives_shard_hand_off():
+    builder = WeatherFrameBuilder(2)
+    builder.extend([record('A', '2024-01-01 10:00', 1704078000), record('B', '2024-01-01 10:00', None)])
+    merged = WeatherFrameBuilder(1)
+    merged.extend_encoded(builder.to_bytes())
+
+    epochs = merged.build()['last_updated_epoch']
+    assert str(epochs.dtype) == 'Int64'
+    assert epochs['A'] == 1704078000 and epochs.isna()['B']
@@ -7,12 +7,15 @@ from .helpers import (
     format_percentage,
     format_speed,
     validate_api_key,
+    is_module_available,
+    lazy_exports,
     safe_float_conversion,
     safe_int_conversion,
     format_file_size,
     get_districts_by_search,
     ColoredOutput
 )
+from .name_index import DistrictNameIndex, NameMatch, district_index, normalize_name
 
 __all__ = [
     'clear_screen',
@@ -21,9 +24,15 @@ __all__ = [
     'format_percentage',
     'format_speed',
     'validate_api_key',
+    'is_module_available',
+    'lazy_exports',
     'safe_float_conversion',
     'safe_int_conversion',
     'format_file_size',
     'get_districts_by_search',
-    'ColoredOutput'
+    'ColoredOutput',
+    'DistrictNameIndex',
+    'NameMatch',
+    'district_index',
+    'normalize_name'
 ]
\ No newline at end of file
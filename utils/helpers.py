@@ -2,8 +2,11 @@
 """Utility functions untuk weather info system"""
 
 import os
+import importlib.util
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List
+
+from .name_index import district_index
 
 def clear_screen():
     """Cross-platform screen clearing"""
@@ -30,6 +33,21 @@ def validate_api_key(api_key: str) -> bool:
     """Validate API key format"""
     return bool(api_key and isinstance(api_key, str) and len(api_key.strip()) > 0)
 
+def is_module_available(module_name: str) -> bool:
+    """Cek apakah modul bisa di-import tanpa benar-benar meng-import-nya"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """__getattr__ level-modul (PEP 562): submodul paket baru di-import saat atributnya dipakai"""
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        return getattr(importlib.import_module(exports[name], package), name)
+    return __getattr__
+
 def safe_float_conversion(value: Any, default: float = 0.0) -> float:
     """Safely convert value to float"""
     try:
@@ -57,10 +75,9 @@ def format_file_size(file_path: str) -> str:
     except OSError:
         return "Unknown size"
 
-def get_districts_by_search(districts: List[str], search_term: str) -> List[str]:
-    """Search districts by term"""
-    search_term = search_term.lower()
-    return [d for d in districts if search_term in d.lower()]
+def get_districts_by_search(districts: List[str], search_term: str, limit: int = 10) -> List[str]:
+    """Search districts by term (ranked: exact, prefix, substring, fuzzy)"""
+    return [match.name for match in district_index(districts).search(search_term, limit)]
 
 class ColoredOutput:
     """Class untuk colored terminal output"""
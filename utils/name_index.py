@@ -0,0 +1,198 @@
+# utils/name_index.py
+"""Index nama kecamatan: trie awalan ternormalisasi plus pencocokan fuzzy trigram/edit distance"""
+
+import functools
+import re
+import unicodedata
+from collections import namedtuple
+from typing import Dict, Iterable, List, Sequence, Set
+
+# Hasil pencarian; kind salah satu 'exact', 'prefix', 'word', 'substring', 'fuzzy'
+NameMatch = namedtuple('NameMatch', ['name', 'score', 'kind'])
+
+ADMIN_PREFIXES = ('kecamatan', 'kec', 'kabupaten', 'kab', 'kota', 'desa', 'kelurahan', 'kel')
+# Ejaan lama (van Ophuijsen/Soewandi) ke ejaan baru; y dan j disamakan karena 'j' lama = 'y' baru
+SPELLING_RULES = (('oe', 'u'), ('dj', 'j'), ('tj', 'c'), ('ch', 'kh'), ('y', 'j'))
+SCORES = {'exact': 1.0, 'prefix': 0.9, 'word': 0.8, 'substring': 0.7}
+FUZZY_MAX_SCORE = 0.65
+FUZZY_MIN_SIMILARITY = 0.7
+FUZZY_MIN_DICE = 0.3
+FUZZY_CANDIDATES = 16
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+_REPEATED = re.compile(r'(.)\1+')
+_PREFIX = re.compile(r'^(?:%s)\b\s*' % '|'.join(ADMIN_PREFIXES))
+
+
+def normalize_name(text: str, strip_prefix: bool = True) -> str:
+    """Bentuk kanonik nama: huruf kecil tanpa aksen/tanda baca/prefix 'Kec.', ejaan lama diseragamkan
+
+    'Kec. Sidoardjo' dan 'Sidoarjo' sama-sama menjadi 'sidoarjo'. strip_prefix=False mempertahankan prefix
+    administratif ('Kota Malang' tetap 'kota malang') untuk membedakan nama yang bentuk kanoniknya sama.
+    """
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    text = _NON_ALNUM.sub(' ', text).strip()
+    if strip_prefix:
+        text = _PREFIX.sub('', text) or text
+    for old, new in SPELLING_RULES:
+        text = text.replace(old, new)
+    return _REPEATED.sub(r'\1', text)
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int = None) -> int:
+    """Jarak Levenshtein dua baris DP; berhenti lebih awal (mengembalikan limit + 1) bila melewati limit"""
+    # Awalan dan akhiran yang sama tidak memengaruhi jarak
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    a, b = a[start:], b[start:]
+    while a and b and a[-1] == b[-1]:
+        a, b = a[:-1], b[:-1]
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class _TrieNode:
+    __slots__ = ('children', 'ids')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.ids: Set[int] = set()  # semua nama yang melewati node ini
+
+
+class DistrictNameIndex:
+    """Resolusi nama kecamatan yang diketik pengguna menjadi kandidat berperingkat"""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(dict.fromkeys(names))
+        self.keys = [normalize_name(name) for name in self.names]
+        self.by_key: Dict[str, List[int]] = {}
+        self.name_trie = _TrieNode()
+        self.word_trie = _TrieNode()
+        self.trigram_ids: Dict[str, Set[int]] = {}
+        self.trigram_counts: List[int] = []
+        for i, key in enumerate(self.keys):
+            self.by_key.setdefault(key, []).append(i)
+            self._insert(self.name_trie, key.replace(' ', ''), i)
+            for word in key.split()[1:]:
+                self._insert(self.word_trie, word, i)
+            grams = trigrams(key)
+            self.trigram_counts.append(len(grams))
+            for gram in grams:
+                self.trigram_ids.setdefault(gram, set()).add(i)
+
+    @staticmethod
+    def _insert(root: _TrieNode, key: str, i: int):
+        node = root
+        node.ids.add(i)
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            node.ids.add(i)
+
+    @staticmethod
+    def _lookup(root: _TrieNode, prefix: str) -> Set[int]:
+        node = root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+    def search(self, term: str, limit: int = 10) -> List[NameMatch]:
+        """Kandidat terurut skor: exact > awalan nama > awalan kata > substring > fuzzy
+
+        Substring/fuzzy hanya dicari bila hasil exact dan awalan belum mencapai limit.
+        """
+        key = normalize_name(term)
+        if not key:
+            return []
+        scores: Dict[int, tuple] = {}
+
+        def offer(ids: Iterable[int], kind: str, score: float):
+            for i in ids:
+                if i not in scores or scores[i][0] < score:
+                    scores[i] = (score, kind)
+
+        offer(self.by_key.get(key, ()), 'exact', SCORES['exact'])
+        offer(self._lookup(self.name_trie, key.replace(' ', '')), 'prefix', SCORES['prefix'])
+        offer(self._lookup(self.word_trie, key), 'word', SCORES['word'])
+
+        if len(scores) < limit:
+            self._offer_approximate(key, scores, offer)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], len(self.names[item[0]]), self.names[item[0]]))
+        return [NameMatch(self.names[i], round(score, 3), kind) for i, (score, kind) in ranked[:limit]]
+
+    def _offer_approximate(self, key: str, scores: Dict[int, tuple], offer):
+        """Substring dan fuzzy: kandidat disaring lewat trigram, baru yang terbaik dihitung edit distance-nya"""
+        grams = trigrams(key)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for i in self.trigram_ids.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        inner = sum(1 for gram in grams if ' ' not in gram)
+
+        fuzzy = []
+        for i, count in shared.items():
+            if i in scores:
+                continue
+            if count >= inner and key in self.keys[i]:
+                offer((i,), 'substring', SCORES['substring'])
+                continue
+            dice = 2 * count / (len(grams) + self.trigram_counts[i])
+            # Selisih panjang adalah batas bawah edit distance
+            max_len = max(len(key), len(self.keys[i]))
+            if dice >= FUZZY_MIN_DICE and abs(len(key) - len(self.keys[i])) <= (1 - FUZZY_MIN_SIMILARITY) * max_len:
+                fuzzy.append((dice, i))
+
+        for _, i in sorted(fuzzy, reverse=True)[:FUZZY_CANDIDATES]:
+            max_len = max(len(key), len(self.keys[i]))
+            distance = edit_distance(key, self.keys[i], int((1 - FUZZY_MIN_SIMILARITY) * max_len))
+            similarity = 1 - distance / max_len
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                offer((i,), 'fuzzy', FUZZY_MAX_SCORE * similarity)
+
+    def resolve(self, term: str) -> List[NameMatch]:
+        """Satu kandidat bila jelas (exact atau satu-satunya hasil), selain itu semua kandidat berperingkat
+
+        Beberapa nama bisa exact sekaligus ('Kota Malang' dan 'Malang' sama-sama 'malang'): semuanya dikembalikan
+        agar pengguna memilih, dengan nama yang sama persis termasuk prefix yang diketik di urutan pertama.
+        """
+        matches = self.search(term)
+        exact = [match for match in matches if match.kind == 'exact']
+        if len(exact) > 1:
+            literal = normalize_name(term, strip_prefix=False)
+            return sorted(exact, key=lambda match: normalize_name(match.name, strip_prefix=False) != literal)
+        if matches and (exact or len(matches) == 1):
+            return matches[:1]
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_index(names: tuple) -> DistrictNameIndex:
+    return DistrictNameIndex(names)
+
+
+def district_index(names: Sequence[str]) -> DistrictNameIndex:
+    """Index untuk daftar nama ini; dibangun sekali lalu dipakai ulang selama daftarnya sama"""
+    return _cached_index(tuple(names))
@@ -1,6 +1,8 @@
 # views/__init__.py
 """Views package untuk weather info system"""
 
-from .weather_view import WeatherView
+from utils.helpers import lazy_exports
+
+__getattr__ = lazy_exports(__name__, {'WeatherView': '.weather_view'})
 
 __all__ = ['WeatherView']
\ No newline at end of file
@@ -1,14 +1,30 @@
 # views/weather_view.py
 import pandas as pd
 import os
-from typing import List
-from services.plot_service import PlotService
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from services.plot_service import PlotService, RenderJob
+    from utils.name_index import NameMatch
 
 class WeatherView:
     """View untuk menampilkan informasi cuaca di terminal"""
     
     def __init__(self):
-        self.plot_service = PlotService()
+        self._plot_service: Optional['PlotService'] = None
+    
+    @property
+    def plot_service(self) -> 'PlotService':
+        """PlotService (matplotlib/seaborn) baru dimuat saat grafik pertama kali dibutuhkan"""
+        if self._plot_service is None:
+            from services.plot_service import PlotService
+            self._plot_service = PlotService()
+        return self._plot_service
+    
+    def shutdown(self):
+        """Menghentikan worker render bila PlotService sudah pernah dipakai"""
+        if self._plot_service is not None:
+            self._plot_service.shutdown()
     
     @staticmethod
     def clear_screen():
@@ -31,19 +47,22 @@ class WeatherView:
         print("2. Lihat Cuaca Kecamatan Tertentu")
         print("3. Cari Cuaca Berdasarkan Kondisi")
         print("4. Statistik Cuaca & Grafik")
-        print("5. Export Data ke CSV")
+        print("5. Export Data (CSV/Parquet/Feather)")
         print("6. Refresh Data")
         print("7. Keluar")
         print("-" * 40)
     
     @staticmethod
-    def show_weather_summary(weather_df: pd.DataFrame):
-        """Menampilkan ringkasan cuaca semua kecamatan"""
+    def show_weather_summary(weather_df: pd.DataFrame, progress: Optional[Tuple[int, int]] = None):
+        """Menampilkan ringkasan cuaca semua kecamatan (progress diisi bila refresh masih berjalan)"""
         if weather_df.empty:
             print("❌ Tidak ada data cuaca tersedia")
             return
         
         print(f"📊 RINGKASAN CUACA JAWA TIMUR ({len(weather_df)} Kecamatan)")
+        if progress:
+            completed, total = progress
+            print(f"⏳ Refresh berjalan: {completed}/{total} kecamatan sudah diperbarui (data parsial)")
         print("=" * 80)
         
         # Tampilkan DataFrame dengan formatting
@@ -51,9 +70,9 @@ class WeatherView:
         display_df = weather_df[display_cols].copy()
         
         # Format columns
-        display_df['temperature'] = display_df['temperature'].apply(lambda x: f"{x}°C")
-        display_df['humidity'] = display_df['humidity'].apply(lambda x: f"{x}%")
-        display_df['wind_speed'] = display_df['wind_speed'].apply(lambda x: f"{x} km/h")
+        display_df['temperature'] = display_df['temperature'].apply(lambda x: f"{x:.1f}°C")
+        display_df['humidity'] = display_df['humidity'].apply(lambda x: f"{x:.0f}%")
+        display_df['wind_speed'] = display_df['wind_speed'].apply(lambda x: f"{x:.1f} km/h")
         
         # Rename columns for display
         display_df.columns = ['Lokasi', 'Suhu', 'Kondisi', 'Kelembaban', 'Angin']
@@ -84,17 +103,28 @@ class WeatherView:
         for i, district in enumerate(districts, 1):
             print(f"{i:2d}. {district}")
     
-    def show_weather_statistics(self, weather_df: pd.DataFrame, save_plots: bool = True):
-        """Menampilkan statistik cuaca dengan grafik"""
+    @staticmethod
+    def show_district_candidates(term: str, matches: List['NameMatch']):
+        """Menampilkan kandidat kecamatan berperingkat untuk nama yang ambigu"""
+        print(f"🔎 Beberapa kecamatan cocok dengan '{term}':")
+        for i, match in enumerate(matches, 1):
+            print(f"{i:2d}. {match.name:<20} ({match.kind}, skor {match.score:.2f})")
+    
+    def show_weather_statistics(self, weather_df: pd.DataFrame, save_plots: bool = True,
+                                stats: Optional[Tuple[pd.DataFrame, pd.Series]] = None,
+                                preview: bool = False) -> Optional['RenderJob']:
+        """Menampilkan statistik cuaca; grafik dibuat di background dan handle job-nya dikembalikan"""
         if weather_df.empty:
             print("❌ Tidak ada data untuk statistik")
-            return
+            return None
         
         print("📈 STATISTIK CUACA JAWA TIMUR")
         print("=" * 50)
         
-        # Mendapatkan statistik dari plot service
-        stats_df, condition_counts = self.plot_service.get_weather_statistics(weather_df)
+        # Pakai statistik yang sudah dihitung bila ada, selain itu hitung lewat plot service
+        if stats is None:
+            stats = self.plot_service.get_weather_statistics(weather_df)
+        stats_df, condition_counts = stats
         
         print("📊 STATISTIK DESKRIPTIF:")
         print(stats_df.round(2).to_string())
@@ -108,31 +138,102 @@ class WeatherView:
         
         if save_plots:
             try:
-                filename = self.plot_service.create_weather_plots(weather_df)
-                print(f"📊 Grafik berhasil disimpan: {filename}")
+                job = self.plot_service.submit_weather_plots(weather_df, preview=preview)
+                self.show_render_job_submitted(job)
+                return job
             except Exception as e:
                 print(f"❌ Error membuat grafik: {e}")
+        return None
+    
+    def submit_kabupaten_plots(self, weather_df: pd.DataFrame, kabupaten_lookup: Dict[str, str]):
+        """Menjadwalkan grafik per kabupaten di worker pool dan mengembalikan handle job"""
+        try:
+            job = self.plot_service.submit_kabupaten_plots(weather_df, kabupaten_lookup)
+            self.show_render_job_submitted(job)
+            return job
+        except Exception as e:
+            print(f"❌ Error membuat grafik: {e}")
+            return None
+    
+    @staticmethod
+    def show_render_job_submitted(job: 'RenderJob'):
+        """Menampilkan info job render yang baru dijadwalkan"""
+        if job.done():
+            print(f"📊 {job.description} siap (dari cache)")
+        else:
+            print(f"⏳ {job.description} sedang dibuat di background (job #{job.id}), menu tetap bisa dipakai")
+    
+    @staticmethod
+    def show_render_jobs(jobs: List['RenderJob']):
+        """Menampilkan hasil job render yang sudah selesai"""
+        for job in jobs:
+            try:
+                files = job.result()
+                print(f"📊 Job #{job.id} selesai - {job.description}:")
+                for filename in files:
+                    print(f"   {filename}")
+            except Exception as e:
+                print(f"❌ Job #{job.id} gagal - {job.description}: {e}")
+        if jobs:
+            print()
     
     @staticmethod
-    def show_weather_by_condition(weather_df: pd.DataFrame, condition: str):
-        """Menampilkan cuaca berdasarkan kondisi tertentu"""
-        filtered_df = weather_df[weather_df['condition'].str.contains(condition, case=False, na=False)]
+    def show_grouped_statistics(grouped_df: pd.DataFrame, by: str):
+        """Menampilkan rata-rata/min/max per kelompok (kabupaten atau kondisi)"""
+        if grouped_df.empty:
+            print("❌ Tidak ada data untuk statistik")
+            return
         
-        if filtered_df.empty:
+        label = 'KABUPATEN' if by == 'kabupaten' else 'KONDISI CUACA'
+        print(f"📈 STATISTIK PER {label}")
+        print("=" * 50)
+        
+        display_cols = [(col, agg) for col in ['temperature', 'humidity', 'wind_speed']
+                        for agg in ['mean', 'min', 'max']]
+        display_df = grouped_df[display_cols].round(1)
+        display_df.insert(0, ('jumlah', ''), grouped_df[('temperature', 'count')].astype(int))
+        print(display_df.to_string())
+    
+    @staticmethod
+    def show_weather_by_condition(results_df: pd.DataFrame, condition: str):
+        """Menampilkan kecamatan hasil pencarian kondisi/query (sudah difilter oleh model)"""
+        if results_df.empty:
             print(f"❌ Tidak ditemukan kecamatan dengan kondisi '{condition}'")
             return
         
-        print(f"🔍 KECAMATAN DENGAN KONDISI '{condition.upper()}':")
+        print(f"🔍 KECAMATAN DENGAN KONDISI '{condition.upper()}' ({len(results_df)} hasil):")
         print("=" * 60)
         
-        for district, row in filtered_df.iterrows():
-            print(f"📍 {district:<15} - {row['condition']} ({row['temperature']:.1f}°C)")
+        lines = [
+            f"📍 {district:<15} - {cond} ({temp:.1f}°C, 💧 {humidity}%)"
+            for district, cond, temp, humidity in zip(
+                results_df.index, results_df['condition'], results_df['temperature'], results_df['humidity']
+            )
+        ]
+        print("\n".join(lines))
     
     @staticmethod
     def show_loading():
         """Menampilkan animasi loading"""
         print("⏳ Memuat data cuaca...")
     
+    @staticmethod
+    def show_refresh_status(progress: Optional[Tuple[int, int]]):
+        """Menampilkan refresh yang sedang berjalan di background"""
+        if progress:
+            completed, total = progress
+            print(f"⏳ Refresh berjalan: {completed}/{total} kecamatan sudah diperbarui")
+        else:
+            print("⏳ Refresh berjalan di background...")
+    
+    @staticmethod
+    def show_data_status(fetched_at, stale_count: int):
+        """Menampilkan waktu data terakhir diambil dan jumlah kecamatan yang basi"""
+        print(f"🕒 Data diambil: {fetched_at:%Y-%m-%d %H:%M:%S}")
+        if stale_count:
+            print(f"⚠️ {stale_count} kecamatan perlu diperbarui (pilih menu 6 untuk refresh)")
+        print()
+    
     @staticmethod
     def show_error(message: str):
         """Menampilkan pesan error"""